@@ -15,6 +15,7 @@
 import os
 import sys
 
+import functools
 import importlib
 import pkgutil
 import platform
@@ -106,6 +107,7 @@ class ExtraDownload:
         self.post_exec = post_exec
 
 
+@functools.lru_cache(maxsize=None)
 def get_build_def_module(submodule_name: str) -> Any:
     return getattr(sys.modules['build_definitions'], submodule_name)
 
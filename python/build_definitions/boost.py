@@ -12,21 +12,85 @@
 # under the License.
 #
 
+import itertools
 import os
+import subprocess
 import sys
 
+from concurrent.futures import ThreadPoolExecutor
+
 from yugabyte_db_thirdparty.build_definition_helpers import *  # noqa
+from yugabyte_db_thirdparty.string_util import shlex_join
+from yugabyte_db_thirdparty.util import (
+    EnvVarContext,
+    which_executable,
+    write_file_atomically,
+)
+
+
+# The complete project-config.jam that we use instead of the one generated by bootstrap.sh, so that
+# we do not depend on the exact format of bootstrap.sh output.
+PROJECT_CONFIG = """# Generated by the YugabyteDB third-party dependencies build.
+
+import option ;
+import feature ;
+{bootstrap_toolset_config}
+using {compiler_type} : {compiler_version} :
+    {compiler_cmd} :
+    {compile_flags}
+    {link_flags} ;
 
+libraries = {libraries} ;
 
-PROJECT_CONFIG = """
-libraries = {5} ;
+option.set prefix : {prefix} ;
+option.set exec-prefix : {prefix} ;
+option.set libdir : {prefix}/lib ;
+option.set includedir : {prefix}/include ;
+"""
+
+# On macOS, bootstrap.sh configures the darwin toolset and makes it the default, and our patches
+# to darwin.jam rely on that, so we keep this part of the bootstrap.sh configuration. On Linux, we
+# do not want the gcc toolset that bootstrap.sh would configure, because we configure our own
+# toolset.
+DARWIN_TOOLSET_CONFIG = """
+if ! darwin in [ feature.values <toolset> ]
+{
+    using darwin ;
+}
 
-using {0} : {1} :
-    {2} :
-    {3}
-    {4} ;
+project : default-build <toolset>darwin ;
 """
 
+# Maps our compiler type to the Boost toolset name and version to use in project-config.jam.
+# Compiler types not listed here are used as the toolset name with an empty version.
+COMPILER_REMAP = {
+    'gcc8': ('gcc', '8'),
+    'gcc9': ('gcc', '9'),
+    'gcc10': ('gcc', '10'),
+    'gcc11': ('gcc', '11'),
+    'clang': ('clang', ''),
+}
+
+# Created in the Boost build directory after bootstrap.sh succeeds.
+BOOST_BOOTSTRAP_STAMP_FILE_NAME = '.yb_boost_bootstrap_stamp'
+
+# Each compiler process building Boost can take around 1 GB of RAM, so we limit the parallelism of
+# b2 even on machines with a very large number of cores, as well as based on available memory.
+MAX_B2_PARALLELISM = 64
+B2_MEMORY_PER_JOB_BYTES = 1024 * 1024 * 1024
+
+
+def run_silent_command(args: List[str]) -> None:
+    """
+    Runs a command that produces no output on success, such as install_name_tool. Its error output
+    is only logged if the command fails.
+    """
+    log("Running command: %s", shlex_join(args))
+    result = subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError("Command %s failed with code %d:\n%s" % (
+            shlex_join(args), result.returncode, result.stderr.decode('utf-8', errors='replace')))
+
 
 class BoostDependency(Dependency):
     def __init__(self) -> None:
@@ -38,7 +102,7 @@ class BoostDependency(Dependency):
                         'boost_1_69_0.tar.bz2',
             build_group=BUILD_GROUP_INSTRUMENTED,
             license='Boost Software License 1.0')
-        self.dir = '{}_{}'.format(self.name, self.underscored_version)
+        self.dir = f'{self.name}_{self.underscored_version}'
         self.copy_sources = True
         self.patches = ['boost-1-69-remove-pending-integer_log2-include.patch',
                         'boost-1-69-mac-compiler-flags.patch']
@@ -49,41 +113,92 @@ class BoostDependency(Dependency):
 
         log_prefix = builder.log_prefix(self)
         prefix = self.get_install_prefix(builder)
-        log_output(log_prefix, ['./bootstrap.sh', '--prefix={}'.format(builder.prefix)])
-        project_config = 'project-config.jam'
-        with open(project_config, 'rt') as inp:
-            original_lines = inp.readlines()
-        with open(project_config, 'wt') as out:
-            for line in original_lines:
-                lstripped = line.lstrip()
-                if not lstripped.startswith('libraries =') and \
-                   not lstripped.startswith('using gcc ;') and \
-                   not lstripped.startswith('project : default-build <toolset>gcc ;'):
-                    out.write(line)
-            cxx_flags = builder.compiler_flags + builder.cxx_flags
-            compiler_type = builder.compiler_choice.compiler_type
-            compiler_version = ''
-            if compiler_type == 'gcc8':
-                compiler_type = 'gcc'
-                compiler_version = '8'
-            out.write(PROJECT_CONFIG.format(
-                    compiler_type,
-                    compiler_version,
-                    builder.compiler_choice.get_cxx_compiler(),
-                    ' '.join(['<compileflags>' + flag for flag in cxx_flags]),
-                    ' '.join(['<linkflags>' + flag for flag in cxx_flags + builder.ld_flags]),
-                    ' '.join(['--with-{}'.format(lib) for lib in libs])))
-        log_output(log_prefix, ['./b2', 'install', 'cxxstd=14'])
+
+        cxx_flags = builder.compiler_flags + builder.cxx_flags
+        compiler_type, compiler_version = COMPILER_REMAP.get(
+            builder.compiler_choice.compiler_type, (builder.compiler_choice.compiler_type, ''))
+
+        # Boost does not use the CC/CXX environment variables, so we have to put ccache into the
+        # compiler command in project-config.jam ourselves.
+        cxx_compiler_cmd = builder.compiler_choice.get_cxx_compiler()
+        ccache_env_vars: Dict[str, Optional[str]] = {}
+        if builder.compiler_choice.use_ccache:
+            ccache_path = which_executable('ccache')
+            if ccache_path:
+                cxx_compiler_cmd = '{} {}'.format(ccache_path, cxx_compiler_cmd)
+                ccache_env_vars = {
+                    'CCACHE_BASEDIR': os.getcwd(),
+                    'CCACHE_COMPRESS': '1',
+                    'CCACHE_SLOPPINESS': 'time_macros,include_file_mtime',
+                }
+            else:
+                log("ccache not found, building Boost without it")
+
+        # bootstrap.sh only builds the b2 executable (we write project-config.jam ourselves), so we
+        # can reuse b2 from a previous build in the same build directory.
+        if os.path.exists('b2') and os.path.exists(BOOST_BOOTSTRAP_STAMP_FILE_NAME):
+            log("Boost is already bootstrapped in %s, not running bootstrap.sh", os.getcwd())
+        else:
+            log_output(log_prefix, [
+                './bootstrap.sh',
+                '--prefix={}'.format(builder.prefix),
+                '--with-libraries={}'.format(','.join(libs))
+            ])
+            with open(BOOST_BOOTSTRAP_STAMP_FILE_NAME, 'wt'):
+                pass
+        project_config_text = PROJECT_CONFIG.format(
+            bootstrap_toolset_config=DARWIN_TOOLSET_CONFIG if is_macos() else '',
+            compiler_type=compiler_type,
+            compiler_version=compiler_version,
+            compiler_cmd=cxx_compiler_cmd,
+            compile_flags=' '.join(f'<compileflags>{flag}' for flag in cxx_flags),
+            link_flags=' '.join(f'<linkflags>{flag}'
+                                for flag in itertools.chain(cxx_flags, builder.ld_flags)),
+            libraries=' '.join(f'--with-{lib}' for lib in libs),
+            prefix=builder.prefix)
+        write_file_atomically('project-config.jam', project_config_text)
+        b2_parallelism = min(get_make_parallelism(), MAX_B2_PARALLELISM)
+        available_memory_bytes = get_available_memory_bytes()
+        if available_memory_bytes is not None:
+            b2_parallelism = min(
+                b2_parallelism, max(1, available_memory_bytes // B2_MEMORY_PER_JOB_BYTES))
+        b2_cmd = ['./b2']
+        if os.getenv('YB_THIRDPARTY_BOOST_VERBOSE') != '1':
+            # Do not print a line for every action b2 performs. Compiler errors are still shown.
+            b2_cmd.append('-d0')
+        b2_cmd += [
+            # Stop at the first error.
+            '-q',
+            'install',
+            'cxxstd=14',
+            # We only need the release variant. Both static and shared libraries are built, because
+            # dependent projects may link Boost statically.
+            'variant=release',
+            '-j{}'.format(b2_parallelism),
+        ]
+        with EnvVarContext(**ccache_env_vars):
+            log_output(log_prefix, b2_cmd)
 
         if is_macos():
+            # install_name_tool accepts -id and multiple -change options in one invocation, so we
+            # rewrite each library only once. Different libraries are processed in parallel.
+            lib_files = {lib: self.libfile(lib, builder) for lib in libs}
+            lib_paths = {
+                lib: os.path.join(builder.prefix_lib, lib_file)
+                for lib, lib_file in lib_files.items()
+            }
+            commands: List[List[str]] = []
             for lib in libs:
-                path = os.path.join(builder.prefix_lib, self.libfile(lib, builder))
-                log_output(log_prefix, ['install_name_tool', '-id', path, path])
+                path = lib_paths[lib]
+                command = ['install_name_tool', '-id', path]
                 for sublib in libs:
-                    sublib_file = self.libfile(sublib, builder)
-                    sublib_path = os.path.join(builder.prefix_lib, sublib_file)
-                    log_output(log_prefix, ['install_name_tool', '-change', sublib_file,
-                                            sublib_path, path])
+                    command += ['-change', lib_files[sublib], lib_paths[sublib]]
+                command.append(path)
+                commands.append(command)
+
+            with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+                # Iterating over the results re-raises any exception from the worker threads.
+                list(executor.map(run_silent_command, commands))
 
     def libfile(self, lib: str, builder: BuilderInterface) -> str:
-        return 'libboost_{}.{}'.format(lib, builder.dylib_suffix)
+        return f'libboost_{lib}.{builder.dylib_suffix}'
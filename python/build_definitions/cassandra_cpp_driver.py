@@ -26,6 +26,7 @@ class CassandraCppDriverDependency(Dependency):
                 'cassandra-cpp-driver', '2.9.0-yb-12',
                 'https://github.com/YugaByte/cassandra-cpp-driver/archive/{0}.tar.gz',
                 BUILD_GROUP_INSTRUMENTED)
+        self.depends_on = ['libuv']
         self.copy_sources = False
         self.patch_version = 0
         self.patch_strip = 1
@@ -59,10 +60,15 @@ class CassandraCppDriverDependency(Dependency):
     def get_additional_cxx_flags(self, builder: 'BuilderInterface') -> List[str]:
         if is_macos():
             return []
-        extra_cxx_flags: List[str] = []
-        builder.add_checked_flag(extra_cxx_flags, '-Wno-error=implicit-fallthrough')
-        builder.add_checked_flag(extra_cxx_flags, '-Wno-error=class-memaccess')
+        candidate_flags = [
+            '-Wno-error=implicit-fallthrough',
+            '-Wno-error=class-memaccess',
+        ]
         if builder.compiler_choice.is_linux_clang1x():
-            builder.add_checked_flag(extra_cxx_flags, '-Wno-error=unused-command-line-argument')
-            builder.add_checked_flag(extra_cxx_flags, '-Wno-error=deprecated-declarations')
+            candidate_flags.extend([
+                '-Wno-error=unused-command-line-argument',
+                '-Wno-error=deprecated-declarations',
+            ])
+        extra_cxx_flags: List[str] = []
+        builder.add_checked_flags(extra_cxx_flags, candidate_flags)
         return extra_cxx_flags
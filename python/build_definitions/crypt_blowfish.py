@@ -32,7 +32,9 @@ class CryptBlowfishDependency(Dependency):
     def build(self, builder: BuilderInterface) -> None:
         log_prefix = builder.log_prefix(self)
         log_output(log_prefix, ['make', 'clean'])
-        log_output(log_prefix, ['make'])
+        # The Makefile was never built in parallel. Without -j1, make would take slots from a
+        # jobserver inherited through MAKEFLAGS.
+        log_output(log_prefix, ['make', '-j1'])
         crypt_blowfish_include_dir = os.path.join(builder.prefix_include, 'crypt_blowfish')
         mkdir_if_missing(crypt_blowfish_include_dir)
         # Copy over all the headers into a generic include/ directory.
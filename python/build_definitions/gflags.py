@@ -22,6 +22,7 @@ class GFlagsDependency(Dependency):
             version='2.1.2',
             url_pattern='https://github.com/gflags/gflags/archive/v{0}.tar.gz',
             build_group=BUILD_GROUP_INSTRUMENTED)
+        self.depends_on = []
         self.copy_sources = False
 
     def build(self, builder: BuilderInterface) -> None:
@@ -26,6 +26,7 @@ class GLogDependency(Dependency):
             version='0.4.0-yb1',
             url_pattern='https://github.com/yugabyte/glog/archive/v{0}.tar.gz',
             build_group=BUILD_GROUP_INSTRUMENTED)
+        self.depends_on = ['gflags']
         self.patch_version = 1
         self.patch_strip = 0
         self.patches = ['glog-tsan-annotations.patch',
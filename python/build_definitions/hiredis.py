@@ -12,8 +12,6 @@
 # under the License.
 #
 
-import multiprocessing
-
 from yugabyte_db_thirdparty.build_definition_helpers import *  # noqa
 
 
@@ -24,10 +22,11 @@ class HiRedisDependency(Dependency):
             version='0.13.3',
             url_pattern="https://github.com/redis/hiredis/archive/v{0}.zip",
             build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = True
 
     def build(self, builder: BuilderInterface) -> None:
         log_prefix = builder.log_prefix(self)
-        jobs = multiprocessing.cpu_count()
         log_output(log_prefix,
-                   ['make', '-j{}'.format(jobs), 'PREFIX={}'.format(builder.prefix), 'install'])
+                   ['make'] + get_build_tool_parallelism_args('make') +
+                   ['PREFIX={}'.format(builder.prefix), 'install'])
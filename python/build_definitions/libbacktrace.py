@@ -22,6 +22,7 @@ class LibBacktraceDependency(Dependency):
             version='ba79a27ee9a62b1be86d0ddae7614c316b7f6fbb',
             url_pattern='https://github.com/yugabyte/libbacktrace/archive/{0}.zip',
             build_group=BUILD_GROUP_INSTRUMENTED)
+        self.depends_on = []
         self.copy_sources = True
 
     def build(self, builder: BuilderInterface) -> None:
@@ -22,6 +22,7 @@ class LibCDSDependency(Dependency):
             version='2.3.3',
             url_pattern='https://github.com/khizmax/libcds/archive/v{0}.tar.gz',
             build_group=BUILD_GROUP_INSTRUMENTED)
+        self.depends_on = []
         self.copy_sources = False
 
     def build(self, builder: BuilderInterface) -> None:
@@ -22,6 +22,7 @@ class LibEditDependency(Dependency):
               version='20191231-3.1',
               url_pattern='https://github.com/yugabyte/libedit/archive/libedit-{}.tar.gz',
               build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = True
 
     def build(self, builder: BuilderInterface) -> None:
@@ -22,6 +22,7 @@ class LibEvDependency(Dependency):
             version='4.27',
             url_pattern='http://dist.schmorp.de/libev/Attic/libev-{0}.tar.gz',
             build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = True
 
     def build(self, builder: BuilderInterface) -> None:
@@ -22,6 +22,7 @@ class LibUuidDependency(Dependency):
             version='1.0.3',
             url_pattern='https://github.com/yugabyte/libuuid/archive/libuuid-{0}.tar.gz',
             build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = True
 
     def build(self, builder: BuilderInterface) -> None:
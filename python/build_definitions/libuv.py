@@ -22,6 +22,7 @@ class LibUvDependency(Dependency):
             version='1.23.0',
             url_pattern='https://github.com/libuv/libuv/archive/v{0}.tar.gz',
             build_group=BUILD_GROUP_INSTRUMENTED)
+        self.depends_on = []
         self.copy_sources = True
 
     def build(self, builder: BuilderInterface) -> None:
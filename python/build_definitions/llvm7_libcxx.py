@@ -13,7 +13,6 @@
 #
 
 import os
-import multiprocessing
 import subprocess
 import sys
 from build_definitions.llvm7 import LLVM7_VERSION
@@ -87,8 +86,8 @@ class Llvm7LibCXXDependency(Dependency):
         log_output(log_prefix, args)
         log_output(
                 log_prefix,
-                ['make', '-j{}'.format(multiprocessing.cpu_count()), 'install-libcxxabi',
-                 'install-libcxx'])
+                ['make'] + get_build_tool_parallelism_args('make') +
+                ['install-libcxxabi', 'install-libcxx'])
 
         # libcxx-5.0.0 contains bug, cxxabi.h is installed with non existing component
         subprocess.check_call(
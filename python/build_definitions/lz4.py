@@ -23,6 +23,7 @@ class LZ4Dependency(Dependency):
             version='r130',
             url_pattern='https://github.com/lz4/lz4/archive/{0}.tar.gz',
             build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = False
         self.patch_version = 1
         self.patch_strip = 1
@@ -22,6 +22,7 @@ class OpenLDAPDependency(Dependency):
               '2_4_54',
               'https://github.com/yugabyte/openldap/archive/OPENLDAP_REL_ENG_{}.tar.gz',
               BUILD_GROUP_COMMON)
+        self.depends_on = ['openssl']
         self.copy_sources = True
 
     def get_additional_compiler_flags(self, builder: BuilderInterface) -> List[str]:
@@ -25,6 +25,7 @@ class RapidJsonDependency(Dependency):
             version='1.1.0-yb-1',
             url_pattern='https://github.com/yugabyte/rapidjson/archive/v{0}.zip',
             build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = False
 
     def build(self, builder: BuilderInterface) -> None:
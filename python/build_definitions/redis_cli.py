@@ -12,7 +12,6 @@
 # under the License.
 #
 
-import multiprocessing
 import os
 import sys
 import glob
@@ -33,7 +32,7 @@ class RedisCliDependency(Dependency):
 
     def build(self, builder: BuilderInterface) -> None:
         log_prefix = builder.log_prefix(self)
-        log_output(log_prefix, ['make', '-j{}'.format(multiprocessing.cpu_count()), 'redis-cli'])
+        log_output(log_prefix, ['make'] + get_build_tool_parallelism_args('make') + ['redis-cli'])
         log_output(log_prefix, ['cp', 'src/redis-cli', builder.prefix_bin])
 
         if is_macos():
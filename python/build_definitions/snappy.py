@@ -24,6 +24,7 @@ class SnappyDependency(Dependency):
             version='1.1.3',
             url_pattern='https://github.com/google/snappy/archive/{0}.tar.gz',
             build_group=BUILD_GROUP_INSTRUMENTED)
+        self.depends_on = []
         self.copy_sources = True
         self.patch_version = 1
         self.patch_strip = 1
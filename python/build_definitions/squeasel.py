@@ -25,6 +25,7 @@ class SqueaselDependency(Dependency):
             version='8ac777a122fccf0358cb8562e900f8e9edd9ed11-yb-1',
             url_pattern='https://github.com/yugabyte/squeasel/archive/squeasel-{0}.tar.gz',
             build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = True
         self.patches = ['squeasel_bound_addrs_ipv6.patch']
         self.patch_version = 1
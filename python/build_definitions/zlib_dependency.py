@@ -25,6 +25,7 @@ class ZLibDependency(Dependency):
             version='1.2.11',
             url_pattern='https://zlib.net/zlib-{0}.tar.gz',
             build_group=BUILD_GROUP_COMMON)
+        self.depends_on = []
         self.copy_sources = True
 
     def build(self, builder: BuilderInterface) -> None:
@@ -11,8 +11,9 @@
 # under the License.
 
 import os
+import shutil
 
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 TAR_EXTRACT = 'tar --no-same-owner -xf {}'
@@ -27,6 +28,27 @@ ARCHIVE_TYPES = {
     '.zip': ZIP_EXTRACT,
 }
 
+# Multi-threaded decompression programs that tar can use instead of the default single-threaded
+# ones, in the order of preference.
+TAR_PARALLEL_DECOMPRESSORS: Dict[str, List[str]] = {
+    '.tar.bz2': ['lbzip2', 'pbzip2'],
+    '.tar.gz': ['pigz'],
+    '.tgz': ['pigz'],
+}
+
+TAR_EXTRACT_WITH_DECOMPRESSOR = 'tar --no-same-owner --use-compress-program={} -xf {}'
+
+
+def get_extract_cmd(archive_file_name: str, archive_extension: str) -> str:
+    """
+    Returns a shell command that extracts the given archive into the current directory. For
+    compressed tarballs, uses a parallel decompression program if one is available.
+    """
+    for decompressor in TAR_PARALLEL_DECOMPRESSORS.get(archive_extension, []):
+        if shutil.which(decompressor):
+            return TAR_EXTRACT_WITH_DECOMPRESSOR.format(decompressor, archive_file_name)
+    return ARCHIVE_TYPES[archive_extension].format(archive_file_name)
+
 
 def make_archive_name(name: str, version: str, download_url: Optional[str]) -> Optional[str]:
     if download_url is None:
@@ -16,7 +16,12 @@
 # definition module.
 
 from yugabyte_db_thirdparty.builder_interface import BuilderInterface
+from yugabyte_db_thirdparty.builder_helpers import (
+    get_available_memory_bytes,
+    get_make_parallelism,
+)
 from yugabyte_db_thirdparty.dependency import Dependency
+from yugabyte_db_thirdparty.jobserver import get_build_tool_parallelism_args
 from yugabyte_db_thirdparty.custom_logging import log, log_output, fatal
 from yugabyte_db_thirdparty.util import (
     mkdir_if_missing,
@@ -32,5 +37,5 @@ from build_definitions import (
     BUILD_TYPE_TSAN,
 )
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sys_detection import is_macos
@@ -12,14 +12,19 @@
 #
 
 import argparse
+import concurrent.futures
+import contextlib
 import hashlib
+import itertools
 import json
+import multiprocessing
 import os
 import platform
+import stat
 import subprocess
 import sys
-import ruamel.yaml as ruamel_yaml  # type: ignore
-from typing import Optional, List, Set, Tuple, Dict, Any
+from typing import (
+    Optional, List, Set, Tuple, Dict, Any, FrozenSet, ContextManager, TextIO, Iterable, Iterator)
 
 from sys_detection import is_macos, is_linux
 
@@ -34,8 +39,10 @@ from build_definitions import (
     get_build_def_module,
 )
 from yugabyte_db_thirdparty.builder_helpers import PLACEHOLDER_RPATH, get_make_parallelism, \
-    get_rpath_flag, sanitize_flags_line_for_log, log_and_set_env_var_to_list
-from yugabyte_db_thirdparty.builder_helpers import is_ninja_available
+    get_rpath_flag, sanitize_flags_line_for_log, log_and_get_env_vars_from_lists
+from yugabyte_db_thirdparty.builder_helpers import (
+    is_ninja_available, get_cpu_count, get_ubsan_minimal_lib_name,
+    remove_duplicate_search_path_flags)
 from yugabyte_db_thirdparty.builder_interface import BuilderInterface
 from yugabyte_db_thirdparty.cmd_line_args import parse_cmd_line_args
 from yugabyte_db_thirdparty.compiler_choice import CompilerChoice
@@ -48,8 +55,9 @@ from yugabyte_db_thirdparty.env_helpers import write_env_vars
 from yugabyte_db_thirdparty.string_util import indent_lines
 from yugabyte_db_thirdparty.util import (
     assert_dir_exists,
-    assert_list_contains,
+    copy_dir_contents,
     EnvVarContext,
+    find_files_with_name,
     mkdir_if_missing,
     PushDir,
     read_file,
@@ -58,22 +66,167 @@ from yugabyte_db_thirdparty.util import (
     YB_THIRDPARTY_DIR,
 )
 from yugabyte_db_thirdparty.file_system_layout import FileSystemLayout
+from yugabyte_db_thirdparty.git_stamp_index import GitStampIndex, GIT_DIFF_EXTRA_ARGS_FOR_STAMP
+from yugabyte_db_thirdparty.jobserver import (
+    get_build_tool_parallelism_args,
+    is_jobserver_supported,
+    JobServer,
+)
 from yugabyte_db_thirdparty.toolchain import Toolchain, ensure_toolchain_installed
 from yugabyte_db_thirdparty.clang_util import get_clang_library_dir
 
 
-ASAN_FLAGS = [
+# The platform does not change while we are running, so only detect it once.
+IS_LINUX = is_linux()
+IS_MACOS = is_macos()
+
+ASAN_FLAGS = (
     '-fsanitize=address',
     '-fsanitize=undefined',
     '-DADDRESS_SANITIZER',
-]
+)
 
-TSAN_FLAGS = [
+TSAN_FLAGS = (
     '-fsanitize=thread',
     '-DTHREAD_SANITIZER',
+)
+
+# -fPIC is there to always generate position-independent code, even for static libraries.
+DEFAULT_COMPILER_FLAGS = ('-fno-omit-frame-pointer', '-fPIC', '-O2', '-Wall')
+
+FOSSA_MODULES_FILE_NAME = 'fossa_modules.yml'
+FOSSA_MODULES_JSONL_FILE_NAME = 'fossa_modules.jsonl'
+
+# Stored in the build directory of a CMake-based dependency after a successful build. Contains a
+# hash of the CMake arguments and other inputs of the CMake configuration step.
+CMAKE_SIGNATURE_FILE_NAME = '.yb_cmake_signature'
+
+# How many archives to download at the same time while earlier dependencies are being built.
+MAX_PARALLEL_DOWNLOADS = 8
+
+# Directories that do not contain config.log files we are interested in when configure fails.
+CONFIG_LOG_SEARCH_SKIPPED_DIR_NAMES = {'.git', 'doc', 'docs', 'test', 'tests'}
+
+# Flags that every compile command of a dependency built with CMake must contain, by build type.
+REQUIRED_COMPILE_COMMAND_FLAGS: Dict[str, FrozenSet[str]] = {
+    BUILD_TYPE_ASAN: frozenset(['-fsanitize=address', '-fsanitize=undefined']),
+    BUILD_TYPE_TSAN: frozenset(['-fsanitize=thread']),
+}
+
+
+class DependencySpec:
+    """
+    Describes a dependency without creating the Dependency object, so that we only instantiate the
+    dependencies selected for the build. The name must match the name of the Dependency object.
+    """
+    name: str
+    module_name: str
+    class_name: str
+    kwargs: Dict[str, Any]
+
+    def __init__(self, name: str, module_name: str, class_name: str, **kwargs: Any) -> None:
+        self.name = name
+        self.module_name = module_name
+        self.class_name = class_name
+        self.kwargs = kwargs
+
+    def create(self) -> Dependency:
+        # We have to use get_build_def_module to access submodules of build_definitions,
+        # otherwise MyPy gets confused.
+        dep = getattr(get_build_def_module(self.module_name), self.class_name)(**self.kwargs)
+        assert isinstance(dep, Dependency)
+        if dep.name != self.name:
+            raise ValueError("Dependency %s.%s has name %s, expected %s" % (
+                self.module_name, self.class_name, dep.name, self.name))
+        return dep
+
+
+# Dependencies are listed in the order in which they are built.
+
+# Dependencies built before the platform-specific ones.
+INITIAL_DEPENDENCIES = [
+    # Avoiding a name collision with the standard zlib module, hence "zlib_dependency".
+    DependencySpec('zlib', 'zlib_dependency', 'ZLibDependency'),
+    DependencySpec('lz4', 'lz4', 'LZ4Dependency'),
+    DependencySpec('openssl', 'openssl', 'OpenSSLDependency'),
+    DependencySpec('libev', 'libev', 'LibEvDependency'),
+    DependencySpec('rapidjson', 'rapidjson', 'RapidJsonDependency'),
+    DependencySpec('squeasel', 'squeasel', 'SqueaselDependency'),
+    DependencySpec('curl', 'curl', 'CurlDependency'),
+    DependencySpec('hiredis', 'hiredis', 'HiRedisDependency'),
+    DependencySpec('cqlsh', 'cqlsh', 'CQLShDependency'),
+    DependencySpec('redis_cli', 'redis_cli', 'RedisCliDependency'),
+    DependencySpec('flex', 'flex', 'FlexDependency'),
+    DependencySpec('bison', 'bison', 'BisonDependency'),
+    DependencySpec('libedit', 'libedit', 'LibEditDependency'),
+    DependencySpec('openldap', 'openldap', 'OpenLDAPDependency'),
+]
+
+# Dependencies built after the platform-specific ones.
+FINAL_DEPENDENCIES = [
+    DependencySpec('icu4c', 'icu4c', 'Icu4cDependency'),
+    DependencySpec('protobuf', 'protobuf', 'ProtobufDependency'),
+    DependencySpec('crypt_blowfish', 'crypt_blowfish', 'CryptBlowfishDependency'),
+    DependencySpec('boost', 'boost', 'BoostDependency'),
+
+    DependencySpec('gflags', 'gflags', 'GFlagsDependency'),
+    DependencySpec('glog', 'glog', 'GLogDependency'),
+    DependencySpec('gperftools', 'gperftools', 'GPerfToolsDependency'),
+    DependencySpec('gmock', 'gmock', 'GMockDependency'),
+    DependencySpec('snappy', 'snappy', 'SnappyDependency'),
+    DependencySpec('crcutil', 'crcutil', 'CRCUtilDependency'),
+    DependencySpec('libcds', 'libcds', 'LibCDSDependency'),
+
+    DependencySpec('libuv', 'libuv', 'LibUvDependency'),
+    DependencySpec('cassandra-cpp-driver', 'cassandra_cpp_driver', 'CassandraCppDriverDependency'),
 ]
 
 
+class CompilerIndependentFlags:
+    """
+    A copy of the flags set up by Builder.init_compiler_independent_flags for one build type. These
+    flags do not depend on the dependency being built, so we only compute them once per build type.
+    """
+    preprocessor_flags: List[str]
+    ld_flags: List[str]
+    executable_only_ld_flags: List[str]
+    compiler_flags: List[str]
+    c_flags: List[str]
+    cxx_flags: List[str]
+    libs: List[str]
+    lib_dirs: Set[str]
+    rpaths: Set[str]
+    allowed_shared_lib_paths: Set[str]
+
+    def __init__(self, builder: 'Builder', allowed_shared_lib_paths: Set[str]) -> None:
+        self.preprocessor_flags = list(builder.preprocessor_flags)
+        self.ld_flags = list(builder.ld_flags)
+        self.executable_only_ld_flags = list(builder.executable_only_ld_flags)
+        self.compiler_flags = list(builder.compiler_flags)
+        self.c_flags = list(builder.c_flags)
+        self.cxx_flags = list(builder.cxx_flags)
+        self.libs = list(builder.libs)
+        self.lib_dirs = set(builder.lib_dirs)
+        self.rpaths = set(builder.rpaths)
+        self.allowed_shared_lib_paths = allowed_shared_lib_paths
+
+    def apply_to(self, builder: 'Builder') -> None:
+        """
+        Gives the builder its own copy of these flags, because they are further customized for
+        each dependency.
+        """
+        builder.preprocessor_flags = list(self.preprocessor_flags)
+        builder.ld_flags = list(self.ld_flags)
+        builder.executable_only_ld_flags = list(self.executable_only_ld_flags)
+        builder.compiler_flags = list(self.compiler_flags)
+        builder.c_flags = list(self.c_flags)
+        builder.cxx_flags = list(self.cxx_flags)
+        builder.libs = list(self.libs)
+        builder.lib_dirs = set(self.lib_dirs)
+        builder.rpaths = set(self.rpaths)
+        builder.additional_allowed_shared_lib_paths |= self.allowed_shared_lib_paths
+
+
 class Builder(BuilderInterface):
     args: argparse.Namespace
     ld_flags: List[str]
@@ -83,14 +236,83 @@ class Builder(BuilderInterface):
     c_flags: List[str]
     cxx_flags: List[str]
     libs: List[str]
+    # Library directories and RPATHs already present in ld_flags.
+    lib_dirs: Set[str]
+    rpaths: Set[str]
     additional_allowed_shared_lib_paths: Set[str]
     download_manager: DownloadManager
     compiler_choice: CompilerChoice
     fs_layout: FileSystemLayout
     fossa_modules: List[Any]
+    fossa_modules_file: Optional[TextIO]
+    dependency_specs: List[DependencySpec]
+    dependency_specs_by_name: Dict[str, DependencySpec]
+    selected_dependencies: List[Dependency]
+    compiler_independent_flags: Dict[str, CompilerIndependentFlags]
+    build_stamp_by_module: Dict[str, str]
+    git_stamp_index: Optional[GitStampIndex]
+    changed_stamp_input_files: Optional[Set[str]]
+
+    # Effective flags by dependency name and kind of flags. Cleared whenever the flags change.
+    effective_flags_cache: Dict[Tuple[str, str], Tuple[str, ...]]
+
+    # Whether the compiler accepts a flag, by compiler path and flag.
+    compiler_flag_check_results: Dict[Tuple[str, str], bool]
+    openssl_cmake_args: Optional[Tuple[str, ...]]
+
+    # Background downloads of the archives that each dependency needs, by dependency name. An
+    # archive shared by several dependencies is downloaded once, and they all wait for it.
+    download_futures: Dict[str, List['concurrent.futures.Future[None]']]
+
+    # Installed library directories for the current build type and for the common build type.
+    build_type_installed_lib_dir: str
+    common_installed_lib_dir: str
     toolchain: Optional[Toolchain]
     remote_build: bool
 
+    # Builder attributes are accessed for every flag and RPATH of every dependency, so we store them
+    # in slots rather than in a per-instance dictionary. New attributes have to be listed here.
+    __slots__ = (
+        'args',
+        'ld_flags',
+        'executable_only_ld_flags',
+        'compiler_flags',
+        'preprocessor_flags',
+        'c_flags',
+        'cxx_flags',
+        'libs',
+        'lib_dirs',
+        'rpaths',
+        'additional_allowed_shared_lib_paths',
+        'download_manager',
+        'compiler_choice',
+        'fs_layout',
+        'fossa_modules',
+        'fossa_modules_file',
+        'dependency_specs',
+        'dependency_specs_by_name',
+        'selected_dependencies',
+        'compiler_independent_flags',
+        'build_stamp_by_module',
+        'git_stamp_index',
+        'changed_stamp_input_files',
+        'effective_flags_cache',
+        'compiler_flag_check_results',
+        'openssl_cmake_args',
+        'download_futures',
+        'build_type_installed_lib_dir',
+        'common_installed_lib_dir',
+        'toolchain',
+        'remote_build',
+        'linuxbrew_dir',
+        'build_type',
+        'dylib_suffix',
+        'prefix',
+        'prefix_bin',
+        'prefix_include',
+        'prefix_lib',
+    )
+
     """
     This class manages the overall process of building third-party dependencies, including the set
     of dependencies to build, build types, and the directories to install dependencies.
@@ -102,6 +324,15 @@ class Builder(BuilderInterface):
 
         self.toolchain = None
         self.fossa_modules = []
+        self.fossa_modules_file = None
+        self.compiler_independent_flags = {}
+        self.build_stamp_by_module = {}
+        self.git_stamp_index = None
+        self.changed_stamp_input_files = None
+        self.effective_flags_cache = {}
+        self.compiler_flag_check_results = {}
+        self.openssl_cmake_args = None
+        self.download_futures = {}
 
     def parse_args(self) -> None:
         self.args = parse_cmd_line_args()
@@ -112,6 +343,7 @@ class Builder(BuilderInterface):
 
         if self.args.make_parallelism:
             os.environ['YB_MAKE_PARALLELISM'] = str(self.args.make_parallelism)
+            get_make_parallelism.cache_clear()
 
         self.download_manager = DownloadManager(
             should_add_checksum=self.args.add_checksum,
@@ -144,103 +376,68 @@ class Builder(BuilderInterface):
         self.select_dependencies_to_build()
         if self.compiler_choice.devtoolset is not None:
             activate_devtoolset(self.compiler_choice.devtoolset)
+        if is_ninja_available():
+            log("Ninja is available, using it for CMake-based dependencies")
+        else:
+            log("Ninja is unavailable, using make for CMake-based dependencies")
 
     def populate_dependencies(self) -> None:
-        # We have to use get_build_def_module to access submodules of build_definitions,
-        # otherwise MyPy gets confused.
+        self.dependency_specs = list(INITIAL_DEPENDENCIES)
 
-        self.dependencies = [
-            # Avoiding a name collision with the standard zlib module, hence "zlib_dependency".
-            get_build_def_module('zlib_dependency').ZLibDependency(),
-            get_build_def_module('lz4').LZ4Dependency(),
-            get_build_def_module('openssl').OpenSSLDependency(),
-            get_build_def_module('libev').LibEvDependency(),
-            get_build_def_module('rapidjson').RapidJsonDependency(),
-            get_build_def_module('squeasel').SqueaselDependency(),
-            get_build_def_module('curl').CurlDependency(),
-            get_build_def_module('hiredis').HiRedisDependency(),
-            get_build_def_module('cqlsh').CQLShDependency(),
-            get_build_def_module('redis_cli').RedisCliDependency(),
-            get_build_def_module('flex').FlexDependency(),
-            get_build_def_module('bison').BisonDependency(),
-            get_build_def_module('libedit').LibEditDependency(),
-            get_build_def_module('openldap').OpenLDAPDependency(),
-        ]
-
-        if is_linux():
-            self.dependencies += [
-                get_build_def_module('libuuid').LibUuidDependency(),
-            ]
+        if IS_LINUX:
+            self.dependency_specs.append(DependencySpec('libuuid', 'libuuid', 'LibUuidDependency'))
 
             standalone_llvm7_toolchain = self.toolchain and self.toolchain.toolchain_type == 'llvm7'
             if standalone_llvm7_toolchain:
-                self.dependencies.append(
-                        get_build_def_module('llvm7_libcxx').Llvm7LibCXXDependency())
+                self.dependency_specs.append(
+                        DependencySpec('llvm7_libcxx', 'llvm7_libcxx', 'Llvm7LibCXXDependency'))
 
             llvm_major_version: Optional[int] = self.compiler_choice.get_llvm_major_version()
             if (self.compiler_choice.use_only_clang() and
                     llvm_major_version is not None and llvm_major_version >= 10):
                 llvm_version_str = self.compiler_choice.get_llvm_version_str()
-                self.dependencies += [
+                self.dependency_specs += [
                     # New LLVM. We will keep supporting new LLVM versions here.
-                    get_build_def_module('llvm1x_libunwind').Llvm1xLibUnwindDependency(
-                        version=llvm_version_str
-                    ),
-                    get_build_def_module('llvm1x_libcxx').Llvm1xLibCxxAbiDependency(
-                        version=llvm_version_str
-                    ),
-                    get_build_def_module('llvm1x_libcxx').Llvm1xLibCxxDependency(
-                        version=llvm_version_str
-                    ),
+                    DependencySpec('llvm1x_libunwind', 'llvm1x_libunwind',
+                                   'Llvm1xLibUnwindDependency', version=llvm_version_str),
+                    DependencySpec('llvm1x_libcxxabi', 'llvm1x_libcxx',
+                                   'Llvm1xLibCxxAbiDependency', version=llvm_version_str),
+                    DependencySpec('llvm1x_libcxx', 'llvm1x_libcxx',
+                                   'Llvm1xLibCxxDependency', version=llvm_version_str),
                 ]
             else:
-                self.dependencies.append(get_build_def_module('libunwind').LibUnwindDependency())
-
-            self.dependencies.append(get_build_def_module('libbacktrace').LibBacktraceDependency())
-
-        self.dependencies += [
-            get_build_def_module('icu4c').Icu4cDependency(),
-            get_build_def_module('protobuf').ProtobufDependency(),
-            get_build_def_module('crypt_blowfish').CryptBlowfishDependency(),
-            get_build_def_module('boost').BoostDependency(),
-
-            get_build_def_module('gflags').GFlagsDependency(),
-            get_build_def_module('glog').GLogDependency(),
-            get_build_def_module('gperftools').GPerfToolsDependency(),
-            get_build_def_module('gmock').GMockDependency(),
-            get_build_def_module('snappy').SnappyDependency(),
-            get_build_def_module('crcutil').CRCUtilDependency(),
-            get_build_def_module('libcds').LibCDSDependency(),
-
-            get_build_def_module('libuv').LibUvDependency(),
-            get_build_def_module('cassandra_cpp_driver').CassandraCppDriverDependency(),
-        ]
+                self.dependency_specs.append(
+                    DependencySpec('libunwind', 'libunwind', 'LibUnwindDependency'))
+
+            self.dependency_specs.append(
+                DependencySpec('libbacktrace', 'libbacktrace', 'LibBacktraceDependency'))
+
+        self.dependency_specs += FINAL_DEPENDENCIES
+        self.dependency_specs_by_name = {spec.name: spec for spec in self.dependency_specs}
 
     def select_dependencies_to_build(self) -> None:
-        self.selected_dependencies = []
+        """
+        Selects the dependencies to build based on the command line, and only creates Dependency
+        objects for the selected ones.
+        """
         if self.args.dependencies:
-            names = set([dep.name for dep in self.dependencies])
-            for dep in self.args.dependencies:
-                if dep not in names:
+            requested = frozenset(self.args.dependencies)
+            for dep_name in self.args.dependencies:
+                if dep_name not in self.dependency_specs_by_name:
                     fatal("Unknown dependency name: %s. Valid dependency names:\n%s",
-                          dep,
-                          (" " * 4 + ("\n" + " " * 4).join(sorted(names))))
-            for dep in self.dependencies:
-                if dep.name in self.args.dependencies:
-                    self.selected_dependencies.append(dep)
+                          dep_name,
+                          (" " * 4 + ("\n" + " " * 4).join(sorted(self.dependency_specs_by_name))))
+            selected_specs = [spec for spec in self.dependency_specs if spec.name in requested]
         elif self.args.skip:
-            skipped = set(self.args.skip.split(','))
+            skipped = frozenset(self.args.skip.split(','))
             log("Skipping dependencies: %s", sorted(skipped))
-            self.selected_dependencies = []
-            for dependency in self.dependencies:
-                if dependency.name in skipped:
-                    skipped.remove(dependency.name)
-                else:
-                    self.selected_dependencies.append(dependency)
-            if skipped:
-                raise ValueError("Unknown dependencies, cannot skip: %s" % sorted(skipped))
+            unknown = skipped.difference(self.dependency_specs_by_name)
+            if unknown:
+                raise ValueError("Unknown dependencies, cannot skip: %s" % sorted(unknown))
+            selected_specs = [spec for spec in self.dependency_specs if spec.name not in skipped]
         else:
-            self.selected_dependencies = self.dependencies
+            selected_specs = self.dependency_specs
+        self.selected_dependencies = [spec.create() for spec in selected_specs]
 
     def run(self) -> None:
         self.compiler_choice.set_compiler(
@@ -254,10 +451,37 @@ class Builder(BuilderInterface):
                 os.environ['PATH']
         ])
 
+        if not self.args.license_report:
+            self.build_all_build_types()
+            return
+
+        # FOSSA modules are written to a JSON Lines file in the build directory as soon as we know
+        # about them, so that the list is not lost if the build fails. The YAML file is written
+        # when the build succeeds.
+        mkdir_if_missing(self.fs_layout.tp_build_dir)
+        fossa_modules_jsonl_path = os.path.join(
+            self.fs_layout.tp_build_dir, FOSSA_MODULES_JSONL_FILE_NAME)
+        try:
+            with open(fossa_modules_jsonl_path, 'w', buffering=1) as self.fossa_modules_file:
+                self.build_all_build_types()
+        finally:
+            self.fossa_modules_file = None
+
+        # ruamel.yaml is only needed here, so avoid paying for importing it on every invocation
+        # (e.g. remote builds, --clean) until we actually write the FOSSA module list.
+        import ruamel.yaml as ruamel_yaml  # type: ignore
+
+        # Use the C-based emitter when ruamel.yaml.clib is installed.
+        yaml = ruamel_yaml.YAML(typ='safe')
+        with open(os.path.join(YB_THIRDPARTY_DIR, FOSSA_MODULES_FILE_NAME), 'w') as output_file:
+            yaml.dump(self.fossa_modules, output_file)
+        remove_path(fossa_modules_jsonl_path)
+
+    def build_all_build_types(self) -> None:
         self.build_one_build_type(BUILD_TYPE_COMMON)
         build_types = [BUILD_TYPE_UNINSTRUMENTED]
 
-        if is_linux() and self.compiler_choice.use_only_clang() and not self.args.skip_sanitizers:
+        if IS_LINUX and self.compiler_choice.use_only_clang() and not self.args.skip_sanitizers:
             # We only support ASAN/TSAN builds on Clang.
             build_types.append(BUILD_TYPE_ASAN)
             build_types.append(BUILD_TYPE_TSAN)
@@ -266,10 +490,6 @@ class Builder(BuilderInterface):
         for build_type in build_types:
             self.build_one_build_type(build_type)
 
-        yaml = ruamel_yaml.YAML(typ='safe', pure=True)
-        with open(os.path.join(YB_THIRDPARTY_DIR, 'fossa_modules.yml'), 'w') as output_file:
-            yaml.dump(self.fossa_modules, output_file)
-
     def get_build_types(self) -> List[str]:
         return list(BUILD_TYPES)
 
@@ -283,16 +503,20 @@ class Builder(BuilderInterface):
             if self.args.verbose:
                 log("Preparing output directory %s", dir)
             lib_dir = os.path.join(dir, 'lib')
-            mkdir_if_missing(lib_dir)
-            mkdir_if_missing(os.path.join(dir, 'include'))
+            os.makedirs(lib_dir, exist_ok=True)
+            os.makedirs(os.path.join(dir, 'include'), exist_ok=True)
             # On some systems, autotools installs libraries to lib64 rather than lib.    Fix
             # this by setting up lib64 as a symlink to lib.    We have to do this step first
             # to handle cases where one third-party library depends on another.    Make sure
             # we create a relative symlink so that the entire PREFIX_DIR could be moved,
             # e.g. after it is packaged and then downloaded on a different build node.
             lib64_dir = os.path.join(dir, 'lib64')
-            if os.path.exists(lib64_dir):
-                if os.path.islink(lib64_dir):
+            try:
+                lib64_stat: Optional[os.stat_result] = os.lstat(lib64_dir)
+            except FileNotFoundError:
+                lib64_stat = None
+            if lib64_stat is not None:
+                if stat.S_ISLNK(lib64_stat.st_mode):
                     continue
                 remove_path(lib64_dir)
             os.symlink('lib', lib64_dir)
@@ -301,6 +525,7 @@ class Builder(BuilderInterface):
         if self.args.verbose:
             log("Adding an include path: %s", include_path)
         cmd_line_arg = f'-I{include_path}'
+        self.effective_flags_cache.clear()
         self.preprocessor_flags.append(cmd_line_arg)
         self.compiler_flags.append(cmd_line_arg)
 
@@ -310,6 +535,17 @@ class Builder(BuilderInterface):
         function to flags that will work for most compilers we are using, which include various
         versions of GCC and Clang.
         """
+        flags = self.compiler_independent_flags.get(self.build_type)
+        if flags is None:
+            saved_allowed_shared_lib_paths = self.additional_allowed_shared_lib_paths
+            self.additional_allowed_shared_lib_paths = set()
+            self.compute_compiler_independent_flags()
+            flags = CompilerIndependentFlags(self, self.additional_allowed_shared_lib_paths)
+            self.additional_allowed_shared_lib_paths = saved_allowed_shared_lib_paths
+            self.compiler_independent_flags[self.build_type] = flags
+        flags.apply_to(self)
+
+    def compute_compiler_independent_flags(self) -> None:
         self.preprocessor_flags = []
         self.ld_flags = []
         self.executable_only_ld_flags = []
@@ -317,31 +553,32 @@ class Builder(BuilderInterface):
         self.c_flags = []
         self.cxx_flags = []
         self.libs = []
+        self.lib_dirs = set()
+        self.rpaths = set()
 
         self.add_linuxbrew_flags()
-        for include_dir_component in set([BUILD_TYPE_COMMON, self.build_type]):
+        for include_dir_component in dict.fromkeys([BUILD_TYPE_COMMON, self.build_type]):
             self.add_include_path(os.path.join(
                 self.fs_layout.tp_installed_dir, include_dir_component, 'include'))
             self.add_lib_dir_and_rpath(os.path.join(
                 self.fs_layout.tp_installed_dir, include_dir_component, 'lib'))
 
-        self.compiler_flags += self.preprocessor_flags
-        # -fPIC is there to always generate position-independent code, even for static libraries.
-        self.compiler_flags += ['-fno-omit-frame-pointer', '-fPIC', '-O2', '-Wall']
-        if is_linux():
+        self.compiler_flags.extend(self.preprocessor_flags)
+        self.compiler_flags.extend(DEFAULT_COMPILER_FLAGS)
+        if IS_LINUX:
             # On Linux, ensure we set a long enough rpath so we can change it later with chrpath,
             # patchelf, or a similar tool.
             self.add_rpath(PLACEHOLDER_RPATH)
 
             self.dylib_suffix = "so"
-        elif is_macos():
+        elif IS_MACOS:
             self.dylib_suffix = "dylib"
 
             # YugaByte builds with C++11, which on OS X requires using libc++ as the standard
             # library implementation. Some of the dependencies do not compile against libc++ by
             # default, so we specify it explicitly.
             self.cxx_flags.append("-stdlib=libc++")
-            self.ld_flags += ["-lc++", "-lc++abi"]
+            self.ld_flags.extend(("-lc++", "-lc++abi"))
 
             # Build for macOS Mojave or later. See https://bit.ly/37myHbk
             self.compiler_flags.append("-mmacosx-version-min=10.14")
@@ -355,10 +592,10 @@ class Builder(BuilderInterface):
         self.cxx_flags.append('-frtti')
 
         if self.build_type == BUILD_TYPE_ASAN:
-            self.compiler_flags += ASAN_FLAGS
+            self.compiler_flags.extend(ASAN_FLAGS)
 
         if self.build_type == BUILD_TYPE_TSAN:
-            self.compiler_flags += TSAN_FLAGS
+            self.compiler_flags.extend(TSAN_FLAGS)
 
     def add_linuxbrew_flags(self) -> None:
         if self.compiler_choice.using_linuxbrew():
@@ -366,26 +603,43 @@ class Builder(BuilderInterface):
             self.ld_flags.append(" -Wl,-dynamic-linker={}".format(os.path.join(lib_dir, 'ld.so')))
             self.add_lib_dir_and_rpath(lib_dir)
 
+    # Adding a library directory or an RPATH at the end of linker flags has no effect if it is
+    # already there, because the first occurrence takes precedence, so we skip duplicates. Adding
+    # one at the front always changes the search order, so we do that unconditionally.
+
     def add_lib_dir_and_rpath(self, lib_dir: str) -> None:
-        if self.args.verbose:
-            log("Adding a library directory and RPATH at the end of linker flags: %s", lib_dir)
-        self.ld_flags.append("-L{}".format(lib_dir))
+        if lib_dir not in self.lib_dirs:
+            if self.args.verbose:
+                log("Adding a library directory and RPATH at the end of linker flags: %s", lib_dir)
+            self.effective_flags_cache.clear()
+            self.ld_flags.append("-L{}".format(lib_dir))
+            self.lib_dirs.add(lib_dir)
         self.add_rpath(lib_dir)
 
     def prepend_lib_dir_and_rpath(self, lib_dir: str) -> None:
         if self.args.verbose:
             log("Adding a library directory and RPATH at the front of linker flags: %s", lib_dir)
+        self.effective_flags_cache.clear()
         self.ld_flags.insert(0, "-L{}".format(lib_dir))
+        self.lib_dirs.add(lib_dir)
         self.prepend_rpath(lib_dir)
 
     def add_rpath(self, path: str) -> None:
-        log("Adding RPATH at the end of linker flags: %s", path)
-        self.ld_flags.append(get_rpath_flag(path))
         self.additional_allowed_shared_lib_paths.add(path)
+        if path in self.rpaths:
+            return
+        if self.args.verbose:
+            log("Adding RPATH at the end of linker flags: %s", path)
+        self.effective_flags_cache.clear()
+        self.ld_flags.append(get_rpath_flag(path))
+        self.rpaths.add(path)
 
     def prepend_rpath(self, path: str) -> None:
-        log("Adding RPATH at the front of linker flags: %s", path)
+        if self.args.verbose:
+            log("Adding RPATH at the front of linker flags: %s", path)
+        self.effective_flags_cache.clear()
         self.ld_flags.insert(0, get_rpath_flag(path))
+        self.rpaths.add(path)
         self.additional_allowed_shared_lib_paths.add(path)
 
     def log_prefix(self, dep: Dependency) -> str:
@@ -421,25 +675,28 @@ class Builder(BuilderInterface):
                 log(f"The configure step failed. Looking for relevant files in {dir_for_build} "
                     f"to show.")
                 num_files_shown = 0
-                for root, dirs, files in os.walk('.'):
-                    for file_name in files:
-                        if file_name == 'config.log':
-                            file_path = os.path.abspath(os.path.join(root, file_name))
-                            log(
-                                f"Contents of {file_path}:\n"
-                                f"\n"
-                                f"{read_file(file_path)}\n"
-                                f"\n"
-                                f"(End of {file_path}).\n"
-                                f"\n"
-                            )
-                            num_files_shown += 1
+                # The build directory could be large, so limit how long we spend looking.
+                for config_log_path in find_files_with_name(
+                        '.', 'config.log', max_depth=6, timeout_sec=10,
+                        skip_dir_names=CONFIG_LOG_SEARCH_SKIPPED_DIR_NAMES):
+                    file_path = os.path.abspath(config_log_path)
+                    log(
+                        f"Contents of {file_path}:\n"
+                        f"\n"
+                        f"{read_file(file_path)}\n"
+                        f"\n"
+                        f"(End of {file_path}).\n"
+                        f"\n"
+                    )
+                    num_files_shown += 1
                 log(f"Logged contents of {num_files_shown} relevant files in {dir_for_build}.")
                 raise
 
-            log_output(log_prefix, ['make', '-j{}'.format(get_make_parallelism())])
+            log_output(log_prefix, ['make'] + get_build_tool_parallelism_args('make'))
             if install:
-                log_output(log_prefix, ['make'] + install)
+                # Install with one job. Otherwise make would run the installation in parallel using
+                # the -j and jobserver settings inherited through MAKEFLAGS.
+                log_output(log_prefix, ['make', '-j1'] + install)
 
     def build_with_cmake(
             self,
@@ -452,19 +709,13 @@ class Builder(BuilderInterface):
             install_targets: List[str] = ['install'],
             shared_and_static: bool = False) -> None:
         build_tool = 'make'
-        if use_ninja_if_available:
-            ninja_available = is_ninja_available()
-            log('Ninja is %s', 'available' if ninja_available else 'unavailable')
-            if ninja_available:
-                build_tool = 'ninja'
+        if use_ninja_if_available and is_ninja_available():
+            build_tool = 'ninja'
 
         log("Building dependency %s using CMake. Build tool: %s", dep, build_tool)
         log_prefix = self.log_prefix(dep)
         os.environ["YB_REMOTE_COMPILATION"] = "0"
 
-        remove_path('CMakeCache.txt')
-        remove_path('CMakeFiles')
-
         src_path = self.fs_layout.get_source_path(dep)
         if src_subdir_name is not None:
             src_path = os.path.join(src_path, src_subdir_name)
@@ -486,35 +737,51 @@ class Builder(BuilderInterface):
             # TODO: a better approach for setting CMake arguments from multiple places.
             args.append('-DBUILD_SHARED_LIBS=ON')
 
+        # Only start CMake from scratch if something that affects the configuration has changed
+        # since the last successful build in this directory. Otherwise, let CMake reconfigure
+        # incrementally.
+        cmake_signature = self.get_cmake_signature(dep, args)
+        if (not os.path.exists(CMAKE_SIGNATURE_FILE_NAME) or
+                read_file(CMAKE_SIGNATURE_FILE_NAME) != cmake_signature):
+            remove_path(CMAKE_SIGNATURE_FILE_NAME)
+            remove_path('CMakeCache.txt')
+            remove_path('CMakeFiles')
+        else:
+            log("CMake configuration of %s has not changed, keeping CMakeCache.txt", dep.name)
+
         def build_internal(even_more_cmake_args: List[str] = []) -> None:
             final_cmake_args = args + even_more_cmake_args
             log("CMake command line (one argument per line):\n%s" %
-                "\n".join([(" " * 4 + sanitize_flags_line_for_log(line))
-                           for line in final_cmake_args]))
+                sanitize_flags_line_for_log("\n".join(
+                    [" " * 4 + line for line in final_cmake_args])))
             log_output(log_prefix, final_cmake_args)
 
             if build_tool == 'ninja':
                 dep.postprocess_ninja_build_file(self, 'build.ninja')
 
-            build_tool_cmd = [
-                build_tool, '-j{}'.format(get_make_parallelism())
-            ] + extra_build_tool_args
+            build_tool_cmd = (
+                [build_tool] + get_build_tool_parallelism_args(build_tool) + extra_build_tool_args
+            )
 
             log_output(log_prefix, build_tool_cmd)
 
             if should_install:
-                log_output(log_prefix, [build_tool] + install_targets)
-
-            with open('compile_commands.json') as compile_commands_file:
-                compile_commands = json.load(compile_commands_file)
-
-            for command_item in compile_commands:
-                command_args = command_item['command'].split()
-                if self.build_type == BUILD_TYPE_ASAN:
-                    assert_list_contains(command_args, '-fsanitize=address')
-                    assert_list_contains(command_args, '-fsanitize=undefined')
-                if self.build_type == BUILD_TYPE_TSAN:
-                    assert_list_contains(command_args, '-fsanitize=thread')
+                # Install with one job, as in build_with_configure.
+                log_output(log_prefix, [build_tool, '-j1'] + install_targets)
+
+            # Only sanitizer build types require specific flags, so we do not even read
+            # compile_commands.json for other build types. Every compile command is checked
+            # because individual targets may override the flags.
+            required_flags = REQUIRED_COMPILE_COMMAND_FLAGS.get(self.build_type)
+            if required_flags:
+                with open('compile_commands.json') as compile_commands_file:
+                    compile_commands = json.load(compile_commands_file)
+
+                for command_item in compile_commands:
+                    missing_flags = required_flags.difference(command_item['command'].split())
+                    if missing_flags:
+                        raise ValueError("%s not found in compile command: %s" % (
+                            sorted(missing_flags), command_item['command']))
 
         if shared_and_static:
             for build_shared_libs_value, subdir_name in (
@@ -531,6 +798,33 @@ class Builder(BuilderInterface):
         else:
             build_internal()
 
+        write_file(CMAKE_SIGNATURE_FILE_NAME, cmake_signature)
+
+    def get_cmake_signature(self, dep: Dependency, cmake_args: List[str]) -> str:
+        """
+        Returns a hash of everything that affects the CMake configuration of a dependency.
+        """
+        cc_identification = self.compiler_choice.cc_identification
+        cxx_identification = self.compiler_choice.cxx_identification
+        assert cc_identification is not None
+        assert cxx_identification is not None
+        signature = hashlib.blake2b(digest_size=16)
+        for item in [
+            dep.version,
+            self.build_type,
+            # CMake uses the compilers from CC and CXX, which may be the compiler wrapper scripts.
+            os.environ['CC'],
+            os.environ['CXX'],
+            self.compiler_choice.get_c_compiler(),
+            self.compiler_choice.get_cxx_compiler(),
+            # Detects a compiler upgraded in place at the same path.
+            cc_identification.full_version_output_str,
+            cxx_identification.full_version_output_str,
+        ] + cmake_args:
+            signature.update(item.encode('utf-8'))
+            signature.update(b'\0')
+        return signature.hexdigest()
+
     def build_one_build_type(self, build_type: str) -> None:
         if (build_type != BUILD_TYPE_COMMON and
                 self.args.build_type is not None and
@@ -544,19 +838,158 @@ class Builder(BuilderInterface):
             BUILD_GROUP_COMMON if build_type == BUILD_TYPE_COMMON else BUILD_GROUP_INSTRUMENTED
         )
 
-        for dep in self.selected_dependencies:
-            if build_group == dep.build_group:
+        deps_in_group = [
+            dep for dep in self.selected_dependencies if dep.build_group == build_group
+        ]
+        deps_to_build = []
+        with self.prefetching_downloads(deps_in_group):
+            for dep in deps_in_group:
                 self.perform_pre_build_steps(dep)
                 should_build = dep.should_build(self)
-                should_rebuild = self.should_rebuild_dependency(dep)
+                # Dependencies that we are not going to build only need their flags processed, so
+                # there is no need to look at their build stamps.
+                should_rebuild = should_build and self.should_rebuild_dependency(dep)
                 if should_build and should_rebuild:
-                    self.build_dependency(dep, only_process_flags=False)
+                    if self.args.parallel_deps:
+                        deps_to_build.append(dep)
+                    else:
+                        self.build_dependency(dep, only_process_flags=False)
                 else:
                     self.build_dependency(dep, only_process_flags=True)
                     log(f"Skipped dependency {dep.name}: "
                         f"should_build={should_build}, "
                         f"should_rebuild={should_rebuild}.")
 
+        # The download threads are done at this point, so it is safe to fork worker processes.
+        if deps_to_build:
+            self.build_dependencies_in_parallel(deps_to_build)
+
+    def get_missing_downloads(self, dep: Dependency) -> List[Tuple[str, str]]:
+        """
+        Returns the URLs and local paths of the archives that perform_pre_build_steps would have to
+        download for the given dependency.
+        """
+        src_path = self.fs_layout.get_source_path(dep)
+        if os.path.exists(os.path.join(src_path, 'patchlevel-{}'.format(dep.patch_version))):
+            return []
+        downloads = []
+        archive_path = self.fs_layout.get_archive_path(dep)
+        if dep.download_url not in (None, 'mkdir') and archive_path is not None:
+            assert dep.download_url is not None
+            downloads.append((dep.download_url, archive_path))
+        for extra in dep.extra_downloads:
+            assert extra.archive_name is not None
+            downloads.append((extra.download_url, os.path.join(
+                self.download_manager.download_dir, extra.archive_name)))
+        return [(url, path) for url, path in downloads if not os.path.exists(path)]
+
+    def download_archive(self, url: str, path: str) -> None:
+        # Checksums are verified, and added to the checksum file if needed, on the main thread when
+        # the dependency is prepared for the build.
+        self.download_manager.ensure_file_downloaded(
+            url=url,
+            file_path=path,
+            enable_using_alternative_url=True,
+            verify_checksum=False)
+
+    @contextlib.contextmanager
+    def prefetching_downloads(self, deps: List[Dependency]) -> Iterator[None]:
+        """
+        Downloads the archives of the given dependencies in background threads within the context,
+        so that downloads overlap with each other and with the builds of the dependencies before
+        them. Only archive files are downloaded in the background. Extracting and patching happen
+        in perform_pre_build_steps, which first waits for the downloads of its dependency.
+        Dependencies that share an archive, such as the LLVM runtime libraries, share its download.
+        """
+        downloads_by_dep_name = {}
+        url_by_path: Dict[str, str] = {}
+        for dep in deps:
+            downloads = self.get_missing_downloads(dep)
+            if downloads:
+                downloads_by_dep_name[dep.name] = downloads
+                for url, path in downloads:
+                    url_by_path.setdefault(path, url)
+        if not url_by_path:
+            yield
+            return
+
+        mkdir_if_missing(self.download_manager.download_dir)
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(len(url_by_path), MAX_PARALLEL_DOWNLOADS))
+        future_by_path: Dict[str, 'concurrent.futures.Future[None]'] = {}
+        try:
+            for path, url in url_by_path.items():
+                future_by_path[path] = executor.submit(self.download_archive, url, path)
+            for dep_name, downloads in downloads_by_dep_name.items():
+                self.download_futures[dep_name] = [future_by_path[path] for _, path in downloads]
+            yield
+        finally:
+            for future in future_by_path.values():
+                future.cancel()
+            self.download_futures = {}
+            executor.shutdown(wait=True)
+
+    def build_dependencies_in_parallel(self, deps: List[Dependency]) -> None:
+        """
+        Builds the given dependencies in worker processes, starting each one as soon as the
+        dependencies it declares in depends_on are built. A dependency that does not declare
+        depends_on waits for all dependencies before it, and all dependencies after it wait for it.
+        """
+        prerequisites: Dict[str, Set[str]] = {}
+        preceding: List[Dependency] = []
+        for dep in deps:
+            if dep.depends_on is None:
+                prerequisites[dep.name] = set(d.name for d in preceding)
+            else:
+                prerequisites[dep.name] = set(
+                    d.name for d in preceding
+                    if d.depends_on is None or d.name in dep.depends_on)
+            preceding.append(dep)
+
+        num_workers = min(self.args.parallel_deps, len(deps))
+        make_parallelism = get_make_parallelism()
+        make_parallelism_per_dep = max(1, make_parallelism // num_workers)
+        log("Building %d dependencies (%s) using %d processes, make parallelism %d each",
+            len(deps), ', '.join(dep.name for dep in deps), num_workers,
+            make_parallelism_per_dep)
+
+        # With a jobserver, make and Ninja processes of all workers share make_parallelism job
+        # slots. Tools that cannot use the jobserver fall back to make_parallelism_per_dep.
+        if is_jobserver_supported():
+            jobserver: ContextManager[None] = JobServer(
+                num_slots=make_parallelism, num_builds=num_workers)
+        else:
+            log("Not using a jobserver: GNU make 4.4 or later is required")
+            jobserver = contextlib.nullcontext()
+
+        # Worker processes are forked from this process, so they get a copy of the builder with
+        # the current build type, and we only need to send them dependency names.
+        global g_builder_for_workers
+        g_builder_for_workers = self
+
+        pending = list(deps)
+        built: Set[str] = set()
+        running: Dict[concurrent.futures.Future, str] = {}
+        with jobserver, concurrent.futures.ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=init_parallel_build_worker,
+                initargs=(make_parallelism_per_dep,)) as executor:
+            while pending or running:
+                for dep in list(pending):
+                    if prerequisites[dep.name] <= built:
+                        pending.remove(dep)
+                        running[executor.submit(build_dependency_in_worker, dep.name)] = dep.name
+                done_futures, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done_futures:
+                    dep_name = running.pop(future)
+                    # This re-raises the exception if the build failed.
+                    self.additional_allowed_shared_lib_paths |= future.result()
+                    built.add(dep_name)
+                    log("Finished building %s (%s) in a worker process",
+                        dep_name, self.build_type)
+
     def get_install_prefix_with_qualifier(self, qualifier: Optional[str] = None) -> str:
         return os.path.join(
             self.fs_layout.tp_installed_dir,
@@ -568,6 +1001,10 @@ class Builder(BuilderInterface):
         self.prefix_bin = os.path.join(self.prefix, 'bin')
         self.prefix_lib = os.path.join(self.prefix, 'lib')
         self.prefix_include = os.path.join(self.prefix, 'include')
+        self.build_type_installed_lib_dir = os.path.join(
+            self.fs_layout.tp_installed_dir, build_type, 'lib')
+        self.common_installed_lib_dir = os.path.join(
+            self.fs_layout.tp_installed_dir, BUILD_TYPE_COMMON, 'lib')
         if self.compiler_choice.building_with_clang(build_type):
             compiler = 'clang'
         else:
@@ -584,9 +1021,10 @@ class Builder(BuilderInterface):
         Initializes compiler and linker flags. No flag customizations should be transferred from one
         dependency to another.
         """
+        self.effective_flags_cache.clear()
         self.init_compiler_independent_flags(dep)
 
-        if not is_macos() and self.compiler_choice.building_with_clang(self.build_type):
+        if not IS_MACOS and self.compiler_choice.building_with_clang(self.build_type):
             # Special setup for Clang on Linux.
             compiler_choice = self.compiler_choice
             llvm_major_version: Optional[int] = compiler_choice.get_llvm_major_version()
@@ -674,7 +1112,7 @@ class Builder(BuilderInterface):
             assert self.compiler_choice.cc is not None
             compiler_rt_lib_dir = get_clang_library_dir(self.compiler_choice.cc)
             self.add_lib_dir_and_rpath(compiler_rt_lib_dir)
-            ubsan_lib_name = f'clang_rt.ubsan_minimal-{platform.processor()}'
+            ubsan_lib_name = get_ubsan_minimal_lib_name()
             ubsan_lib_so_path = os.path.join(compiler_rt_lib_dir, f'lib{ubsan_lib_name}.so')
             if not os.path.exists(ubsan_lib_so_path):
                 raise IOError(f"UBSAN library not found at {ubsan_lib_so_path}")
@@ -719,44 +1157,76 @@ class Builder(BuilderInterface):
         log("c_flags   : %s", self.c_flags)
         log("ld_flags  : %s", self.ld_flags)
 
+    def iter_effective_flags(self, dep: Dependency, kind: str) -> Iterable[str]:
+        if kind == 'compiler':
+            return itertools.chain(self.compiler_flags, dep.get_additional_compiler_flags(self))
+        if kind == 'cxx':
+            return itertools.chain(
+                self.cxx_flags,
+                self.get_cached_effective_flags(dep, 'compiler'),
+                dep.get_additional_cxx_flags(self))
+        if kind == 'c':
+            return itertools.chain(
+                self.c_flags,
+                self.get_cached_effective_flags(dep, 'compiler'),
+                dep.get_additional_c_flags(self))
+        if kind == 'ld':
+            return itertools.chain(self.ld_flags, dep.get_additional_ld_flags(self))
+        if kind == 'executable_ld':
+            return itertools.chain(
+                self.ld_flags,
+                self.executable_only_ld_flags,
+                dep.get_additional_ld_flags(self))
+        if kind == 'preprocessor':
+            return self.preprocessor_flags
+        raise ValueError("Unknown kind of flags: %s" % kind)
+
+    def get_cached_effective_flags(self, dep: Dependency, kind: str) -> Tuple[str, ...]:
+        """
+        Returns the effective flags of the given kind for the given dependency, computing them only
+        once until the builder's flags change.
+        """
+        key = (dep.name, kind)
+        flags = self.effective_flags_cache.get(key)
+        if flags is None:
+            flags = tuple(remove_duplicate_search_path_flags(self.iter_effective_flags(dep, kind)))
+            self.effective_flags_cache[key] = flags
+        return flags
+
     def get_effective_compiler_flags(self, dep: Dependency) -> List[str]:
-        return self.compiler_flags + dep.get_additional_compiler_flags(self)
+        return list(self.get_cached_effective_flags(dep, 'compiler'))
 
     def get_effective_cxx_flags(self, dep: Dependency) -> List[str]:
-        return (self.cxx_flags +
-                self.get_effective_compiler_flags(dep) +
-                dep.get_additional_cxx_flags(self))
+        return list(self.get_cached_effective_flags(dep, 'cxx'))
 
     def get_effective_c_flags(self, dep: Dependency) -> List[str]:
-        return (self.c_flags +
-                self.get_effective_compiler_flags(dep) +
-                dep.get_additional_c_flags(self))
+        return list(self.get_cached_effective_flags(dep, 'c'))
 
     def get_effective_ld_flags(self, dep: Dependency) -> List[str]:
-        return self.ld_flags + dep.get_additional_ld_flags(self)
+        return list(self.get_cached_effective_flags(dep, 'ld'))
 
     def get_effective_executable_ld_flags(self, dep: Dependency) -> List[str]:
-        return self.ld_flags + self.executable_only_ld_flags + dep.get_additional_ld_flags(self)
+        return list(self.get_cached_effective_flags(dep, 'executable_ld'))
 
     def get_effective_preprocessor_flags(self, dep: Dependency) -> List[str]:
-        return list(self.preprocessor_flags)
+        return list(self.get_cached_effective_flags(dep, 'preprocessor'))
 
     def get_common_cmake_flag_args(self, dep: Dependency) -> List[str]:
-        c_flags_str = ' '.join(self.get_effective_c_flags(dep))
-        cxx_flags_str = ' '.join(self.get_effective_cxx_flags(dep))
+        c_flags_str = ' '.join(self.get_cached_effective_flags(dep, 'c'))
+        cxx_flags_str = ' '.join(self.get_cached_effective_flags(dep, 'cxx'))
 
         # TODO: we are not using this. What is the best way to plug this into CMake?
-        preprocessor_flags_str = ' '.join(self.get_effective_preprocessor_flags(dep))
+        preprocessor_flags_str = ' '.join(self.get_cached_effective_flags(dep, 'preprocessor'))
 
-        ld_flags_str = ' '.join(self.get_effective_ld_flags(dep))
-        exe_ld_flags_str = ' '.join(self.get_effective_executable_ld_flags(dep))
+        ld_flags_str = ' '.join(self.get_cached_effective_flags(dep, 'ld'))
+        exe_ld_flags_str = ' '.join(self.get_cached_effective_flags(dep, 'executable_ld'))
         return [
-            '-DCMAKE_C_FLAGS={}'.format(c_flags_str),
-            '-DCMAKE_CXX_FLAGS={}'.format(cxx_flags_str),
-            '-DCMAKE_SHARED_LINKER_FLAGS={}'.format(ld_flags_str),
-            '-DCMAKE_EXE_LINKER_FLAGS={}'.format(exe_ld_flags_str),
+            f'-DCMAKE_C_FLAGS={c_flags_str}',
+            f'-DCMAKE_CXX_FLAGS={cxx_flags_str}',
+            f'-DCMAKE_SHARED_LINKER_FLAGS={ld_flags_str}',
+            f'-DCMAKE_EXE_LINKER_FLAGS={exe_ld_flags_str}',
             '-DCMAKE_EXPORT_COMPILE_COMMANDS=ON',
-            '-DCMAKE_INSTALL_PREFIX={}'.format(dep.get_install_prefix(self)),
+            f'-DCMAKE_INSTALL_PREFIX={dep.get_install_prefix(self)}',
             '-DCMAKE_POSITION_INDEPENDENT_CODE=ON'
         ]
 
@@ -766,15 +1236,19 @@ class Builder(BuilderInterface):
         colored_log(YELLOW_COLOR, "Building %s (%s)", dep.name, self.build_type)
         colored_log(YELLOW_COLOR, SEPARATOR)
 
+        for download_future in self.download_futures.pop(dep.name, []):
+            download_future.result()
+
         self.download_manager.download_dependency(
             dep=dep,
             src_path=self.fs_layout.get_source_path(dep),
             archive_path=self.fs_layout.get_archive_path(dep))
 
+        # FOSSA modules are only needed for the license report.
         archive_name = dep.get_archive_name()
-        if archive_name:
+        if archive_name and self.args.license_report:
             archive_path = os.path.join('downloads', archive_name)
-            self.fossa_modules.append({
+            fossa_module = {
                 "fossa_module": {
                     "name": f"{dep.name}-{dep.version}",
                     "type": "raw",
@@ -784,7 +1258,10 @@ class Builder(BuilderInterface):
                     "url": dep.download_url,
                     "sha256sum": self.download_manager.get_expected_checksum(archive_name)
                 }
-            })
+            }
+            self.fossa_modules.append(fossa_module)
+            if self.fossa_modules_file is not None:
+                self.fossa_modules_file.write(json.dumps(fossa_module) + '\n')
 
     def build_dependency(self, dep: Dependency, only_process_flags: bool = False) -> None:
         """
@@ -799,11 +1276,11 @@ class Builder(BuilderInterface):
         self.init_flags(dep)
 
         # This is needed at least for glog to be able to find gflags.
-        self.add_rpath(os.path.join(self.fs_layout.tp_installed_dir, self.build_type, 'lib'))
+        self.add_rpath(self.build_type_installed_lib_dir)
 
         if self.build_type != BUILD_TYPE_COMMON:
             # Needed to find libunwind for Clang 10 when using compiler-rt.
-            self.add_rpath(os.path.join(self.fs_layout.tp_installed_dir, BUILD_TYPE_COMMON, 'lib'))
+            self.add_rpath(self.common_installed_lib_dir)
 
         if only_process_flags:
             log("Skipping the build of dependecy %s", dep.name)
@@ -814,16 +1291,13 @@ class Builder(BuilderInterface):
                 "specified.", dep.name, self.build_type)
             return
 
-        env_vars: Dict[str, Optional[str]] = {
-            "CPPFLAGS": " ".join(self.preprocessor_flags)
-        }
-
-        log_and_set_env_var_to_list(env_vars, 'CXXFLAGS', self.get_effective_cxx_flags(dep))
-        log_and_set_env_var_to_list(env_vars, 'CFLAGS', self.get_effective_c_flags(dep))
-        log_and_set_env_var_to_list(env_vars, 'LDFLAGS', self.get_effective_ld_flags(dep))
-        log_and_set_env_var_to_list(env_vars, 'LIBS', self.libs)
-        log_and_set_env_var_to_list(
-            env_vars, 'CPPFLAGS', self.get_effective_preprocessor_flags(dep))
+        env_vars = log_and_get_env_vars_from_lists({
+            'CXXFLAGS': self.get_cached_effective_flags(dep, 'cxx'),
+            'CFLAGS': self.get_cached_effective_flags(dep, 'c'),
+            'LDFLAGS': self.get_cached_effective_flags(dep, 'ld'),
+            'LIBS': self.libs,
+            'CPPFLAGS': self.get_cached_effective_flags(dep, 'preprocessor'),
+        })
 
         if self.build_type == BUILD_TYPE_ASAN:
             # To avoid errors similar to:
@@ -853,12 +1327,6 @@ class Builder(BuilderInterface):
     # been made local by the caller.
     def should_rebuild_dependency(self, dep: Dependency) -> bool:
         stamp_path = self.fs_layout.get_build_stamp_path_for_dependency(dep, self.build_type)
-        old_build_stamp = None
-        if os.path.exists(stamp_path):
-            with open(stamp_path, 'rt') as inp:
-                old_build_stamp = inp.read()
-
-        new_build_stamp = self.get_build_stamp_for_dependency(dep)
 
         if dep.dir_name is not None:
             src_dir = self.fs_layout.get_source_path(dep)
@@ -867,6 +1335,18 @@ class Builder(BuilderInterface):
                     dep.name, self.build_type, src_dir)
                 return True
 
+        if self.is_build_stamp_newer_than_inputs(dep, stamp_path):
+            log("Not rebuilding %s (%s) -- build stamp is newer than its inputs.",
+                dep.name, self.build_type)
+            return False
+
+        old_build_stamp = None
+        if os.path.exists(stamp_path):
+            with open(stamp_path, 'rt') as inp:
+                old_build_stamp = inp.read()
+
+        new_build_stamp = self.get_build_stamp_for_dependency(dep)
+
         if old_build_stamp == new_build_stamp:
             log("Not rebuilding %s (%s) -- nothing changed.", dep.name, self.build_type)
             return False
@@ -881,7 +1361,51 @@ class Builder(BuilderInterface):
     # Come up with a string that allows us to tell when to rebuild a particular third-party
     # dependency. The result is returned in the get_build_stamp_for_component_rv variable, which
     # should have been made local by the caller.
-    def get_build_stamp_for_dependency(self, dep: Dependency) -> str:
+    def is_build_stamp_newer_than_inputs(self, dep: Dependency, stamp_path: str) -> bool:
+        """
+        Returns True if the build stamp file was written after the last modification of all the
+        files it is computed from, and none of these files has uncommitted changes. Then the build
+        definition has not changed since the last build, and we do not need to compute the stamp.
+        """
+        try:
+            stamp_mtime = os.stat(stamp_path).st_mtime
+        except FileNotFoundError:
+            return False
+        input_files_for_stamp = self.get_build_stamp_input_files(dep)
+        for path in input_files_for_stamp:
+            if os.stat(os.path.join(YB_THIRDPARTY_DIR, path)).st_mtime > stamp_mtime:
+                return False
+        return self.get_changed_stamp_input_files().isdisjoint(input_files_for_stamp)
+
+    def get_changed_stamp_input_files(self) -> Set[str]:
+        """
+        Returns the build stamp input files of the selected dependencies that have staged or
+        unstaged changes, running "git status" the first time it is needed.
+        """
+        if self.changed_stamp_input_files is None:
+            all_input_files: Set[str] = set()
+            for dep in self.selected_dependencies:
+                all_input_files.update(self.get_build_stamp_input_files(dep))
+            with PushDir(YB_THIRDPARTY_DIR):
+                git_status = subprocess.check_output(
+                    ['git', 'status', '--porcelain', '-z', '--untracked-files=no', '--'] +
+                    sorted(all_input_files)).decode('utf-8')
+            self.changed_stamp_input_files = set()
+            entries = iter(git_status.split('\0'))
+            for entry in entries:
+                if not entry:
+                    continue
+                self.changed_stamp_input_files.add(entry[3:])
+                if entry[0] in 'RC':
+                    # Renames and copies are followed by the original path.
+                    self.changed_stamp_input_files.add(next(entries, ''))
+        return self.changed_stamp_input_files
+
+    def get_build_stamp_input_files(self, dep: Dependency) -> List[str]:
+        """
+        Returns the files, relative to the repository root, that the build stamp of the given
+        dependency is computed from.
+        """
         module_name = dep.__class__.__module__
         assert isinstance(module_name, str), "Dependency's module is not a string: %s" % module_name
         assert module_name.startswith('build_definitions.'), "Invalid module name: %s" % module_name
@@ -889,6 +1413,7 @@ class Builder(BuilderInterface):
         assert len(module_name_components) == 2, (
                 "Expected two components: %s" % module_name_components)
         module_name_final = module_name_components[-1]
+
         input_files_for_stamp = [
             'python/yugabyte_db_thirdparty/yb_build_thirdparty_main.py',
             'build_thirdparty.sh',
@@ -900,21 +1425,44 @@ class Builder(BuilderInterface):
             if not os.path.exists(abs_path):
                 fatal("File '%s' does not exist -- expecting it to exist when creating a 'stamp' "
                       "for the build configuration of '%s'.", abs_path, dep.name)
+        return input_files_for_stamp
 
-        with PushDir(YB_THIRDPARTY_DIR):
-            git_commit_sha1 = subprocess.check_output(
-                ['git', 'log', '--pretty=%H', '-n', '1'] + input_files_for_stamp
-            ).strip().decode('utf-8')
-            build_stamp = 'git_commit_sha1={}\n'.format(git_commit_sha1)
-            for git_extra_arg in (None, '--cached'):
-                git_extra_args = [git_extra_arg] if git_extra_arg else []
-                git_diff = subprocess.check_output(
-                    ['git', 'diff'] + git_extra_args + input_files_for_stamp)
-                git_diff_sha256 = hashlib.sha256(git_diff).hexdigest()
-                build_stamp += 'git_diff_sha256{}={}\n'.format(
-                    '_'.join(git_extra_args).replace('--', '_'),
-                    git_diff_sha256)
-            return build_stamp
+    def get_git_stamp_index(self, input_files_for_stamp: List[str]) -> GitStampIndex:
+        """
+        Returns git information about the build stamp input files of all selected dependencies,
+        collecting it the first time it is needed.
+        """
+        if (self.git_stamp_index is None or
+                not self.git_stamp_index.paths.issuperset(input_files_for_stamp)):
+            all_input_files: Set[str] = set(input_files_for_stamp)
+            for dep in self.selected_dependencies:
+                all_input_files.update(self.get_build_stamp_input_files(dep))
+            self.git_stamp_index = GitStampIndex(YB_THIRDPARTY_DIR, sorted(all_input_files))
+        return self.git_stamp_index
+
+    def get_build_stamp_for_dependency(self, dep: Dependency) -> str:
+        input_files_for_stamp = self.get_build_stamp_input_files(dep)
+        module_file_path = input_files_for_stamp[-1]
+
+        # The stamp only depends on files in this repository, which do not change during the
+        # build, so we compute it once per build definition module.
+        cached_build_stamp = self.build_stamp_by_module.get(module_file_path)
+        if cached_build_stamp is not None:
+            return cached_build_stamp
+
+        git_stamp_index = self.get_git_stamp_index(input_files_for_stamp)
+        git_commit_sha1 = git_stamp_index.get_last_commit(input_files_for_stamp)
+        build_stamp_lines = [f'git_commit_sha1={git_commit_sha1}\n']
+        for git_extra_args in GIT_DIFF_EXTRA_ARGS_FOR_STAMP:
+            git_diff_hash = hashlib.sha256()
+            for git_diff_digest in git_stamp_index.iter_diff_digests(
+                    git_extra_args, input_files_for_stamp):
+                git_diff_hash.update(git_diff_digest)
+            key_suffix = '_'.join(git_extra_args).replace('--', '_')
+            build_stamp_lines.append(f'git_diff_sha256{key_suffix}={git_diff_hash.hexdigest()}\n')
+        build_stamp = ''.join(build_stamp_lines)
+        self.build_stamp_by_module[module_file_path] = build_stamp
+        return build_stamp
 
     def save_build_stamp_for_dependency(self, dep: Dependency) -> None:
         stamp = self.get_build_stamp_for_dependency(dep)
@@ -934,7 +1482,7 @@ class Builder(BuilderInterface):
 
         if dep.copy_sources:
             log("Bootstrapping %s from %s", build_dir, src_dir)
-            subprocess.check_call(['rsync', '-a', src_dir + '/', build_dir])
+            copy_dir_contents(src_dir, build_dir)
         return build_dir
 
     def is_release_build(self) -> bool:
@@ -949,19 +1497,43 @@ class Builder(BuilderInterface):
 
     def check_cxx_compiler_flag(self, flag: str) -> bool:
         compiler_path = self.compiler_choice.get_cxx_compiler()
+        key = (compiler_path, flag)
+        is_accepted = self.compiler_flag_check_results.get(key)
+        if is_accepted is None:
+            is_accepted = self.run_cxx_compiler_flag_check(compiler_path, flag)
+            self.compiler_flag_check_results[key] = is_accepted
+        return is_accepted
+
+    def run_cxx_compiler_flag_check(self, compiler_path: str, flag: str) -> bool:
         log(f"Checking if the compiler {compiler_path} accepts the flag {flag}")
+        # Discard the output binary so that concurrent checks do not overwrite each other's a.out.
         process = subprocess.Popen(
-            [compiler_path, '-x', 'c++', flag, '-'],
+            [compiler_path, '-x', 'c++', flag, '-o', os.devnull, '-'],
             stdin=subprocess.PIPE)
         assert process.stdin is not None
         process.stdin.write("int main() { return 0; }".encode('utf-8'))
         process.stdin.close()
         return process.wait() == 0
 
+    def check_cxx_compiler_flags(self, flags: List[str]) -> List[str]:
+        """
+        Returns the given flags that the C++ compiler accepts, in the same order. The checks run
+        concurrently, because each of them spends most of its time starting the compiler.
+        """
+        if len(flags) <= 1:
+            return [flag for flag in flags if self.check_cxx_compiler_flag(flag)]
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(len(flags), get_cpu_count())) as executor:
+            is_accepted = list(executor.map(self.check_cxx_compiler_flag, flags))
+        return [flag for flag, accepted in zip(flags, is_accepted) if accepted]
+
     def add_checked_flag(self, flags: List[str], flag: str) -> None:
         if self.check_cxx_compiler_flag(flag):
             flags.append(flag)
 
+    def add_checked_flags(self, flags: List[str], candidate_flags: List[str]) -> None:
+        flags.extend(self.check_cxx_compiler_flags(candidate_flags))
+
     def get_openssl_dir(self) -> str:
         return os.path.join(self.fs_layout.tp_installed_common_dir)
 
@@ -970,13 +1542,38 @@ class Builder(BuilderInterface):
         Returns a list of CMake arguments to use to pick up the version of OpenSSL that we should be
         using. Returns an empty list if the default OpenSSL installation should be used.
         """
-        openssl_dir = self.get_openssl_dir()
-        openssl_options = ['-DOPENSSL_ROOT_DIR=' + openssl_dir]
-        openssl_crypto_library = os.path.join(openssl_dir, 'lib', 'libcrypto.' + self.dylib_suffix)
-        openssl_ssl_library = os.path.join(openssl_dir, 'lib', 'libssl.' + self.dylib_suffix)
-        openssl_options += [
-            '-DOPENSSL_CRYPTO_LIBRARY=' + openssl_crypto_library,
-            '-DOPENSSL_SSL_LIBRARY=' + openssl_ssl_library,
-            '-DOPENSSL_LIBRARIES=%s;%s' % (openssl_crypto_library, openssl_ssl_library)
-        ]
-        return openssl_options
+        # These only depend on the installation directory and the platform, so we compute them once.
+        if self.openssl_cmake_args is None:
+            openssl_dir = self.get_openssl_dir()
+            openssl_lib_dir = os.path.join(openssl_dir, 'lib')
+            openssl_crypto_library = os.path.join(
+                openssl_lib_dir, f'libcrypto.{self.dylib_suffix}')
+            openssl_ssl_library = os.path.join(openssl_lib_dir, f'libssl.{self.dylib_suffix}')
+            self.openssl_cmake_args = (
+                f'-DOPENSSL_ROOT_DIR={openssl_dir}',
+                f'-DOPENSSL_CRYPTO_LIBRARY={openssl_crypto_library}',
+                f'-DOPENSSL_SSL_LIBRARY={openssl_ssl_library}',
+                f'-DOPENSSL_LIBRARIES={openssl_crypto_library};{openssl_ssl_library}'
+            )
+        return list(self.openssl_cmake_args)
+
+
+g_builder_for_workers: Optional[Builder] = None
+
+
+def init_parallel_build_worker(make_parallelism: int) -> None:
+    os.environ['YB_MAKE_PARALLELISM'] = str(make_parallelism)
+    get_make_parallelism.cache_clear()
+
+
+def build_dependency_in_worker(dep_name: str) -> Set[str]:
+    """
+    Builds one dependency in a process started by Builder.build_dependencies_in_parallel. Returns
+    the shared library paths that the build allowed, so the parent can include them in its checks.
+    """
+    builder = g_builder_for_workers
+    assert builder is not None
+    dep = [dep for dep in builder.selected_dependencies if dep.name == dep_name][0]
+    builder.additional_allowed_shared_lib_paths = set()
+    builder.build_dependency(dep, only_process_flags=False)
+    return builder.additional_allowed_shared_lib_paths
@@ -12,9 +12,10 @@
 #
 
 
-import multiprocessing
+import functools
 import os
-from typing import Dict, Optional, List
+import platform
+from typing import Dict, Iterable, Optional, List
 
 from yugabyte_db_thirdparty.custom_logging import log
 from yugabyte_db_thirdparty.util import which_executable
@@ -24,19 +25,83 @@ PLACEHOLDER_RPATH = (
     "/tmp/making_sure_we_have_enough_room_to_set_rpath_later_{}_end_of_rpath".format('_' * 256))
 PLACEHOLDER_RPATH_FOR_LOG = '/tmp/long_placeholder_rpath'
 
+# Prefixes of flags that add a directory to the include, library or RPATH search path.
+SEARCH_PATH_FLAG_PREFIXES = ('-I', '-L', '-Wl,-rpath,')
 
-def get_make_parallelism() -> int:
-    return int(os.environ.get('YB_MAKE_PARALLELISM', multiprocessing.cpu_count()))
 
+def get_cpu_count() -> int:
+    """
+    Returns the number of CPUs this process is allowed to run on. In a container restricted to a
+    subset of the host's CPUs, this is smaller than the total number of CPUs on the host.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # os.sched_getaffinity is not available on macOS.
+        return os.cpu_count() or 1
 
-g_is_ninja_available: Optional[bool] = None
+
+def get_available_memory_bytes() -> Optional[int]:
+    """
+    Returns the amount of memory available for starting new processes without swapping, or None if
+    we cannot determine it on this platform.
+    """
+    try:
+        with open('/proc/meminfo') as meminfo_file:
+            for line in meminfo_file:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (IOError, ValueError, IndexError):
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_ubsan_minimal_lib_name() -> str:
+    """
+    Returns the name of Clang's minimal UBSAN runtime library for this CPU architecture. The result
+    is cached because platform.processor() may start a "uname -p" process.
+    """
+    return f'clang_rt.ubsan_minimal-{platform.processor()}'
 
 
+@functools.lru_cache(maxsize=None)
+def get_make_parallelism() -> int:
+    """
+    Returns the number of jobs to run in make and similar tools. The result is cached, so call
+    get_make_parallelism.cache_clear() after changing YB_MAKE_PARALLELISM.
+    """
+    return int(os.environ.get('YB_MAKE_PARALLELISM', get_cpu_count()))
+
+
+@functools.lru_cache(maxsize=None)
 def is_ninja_available() -> bool:
-    global g_is_ninja_available
-    if g_is_ninja_available is None:
-        g_is_ninja_available = bool(which_executable('ninja'))
-    return g_is_ninja_available
+    return bool(which_executable('ninja'))
+
+
+def remove_duplicate_search_path_flags(flags: Iterable[str]) -> List[str]:
+    """
+    Removes repeated include directory, library directory and RPATH flags. Only the first
+    occurrence of such a flag affects the search order, so this does not change the meaning of the
+    command line. Other flags are kept as is, because e.g. "-fno-foo -ffoo -fno-foo" or repeated
+    arguments of -Xclang depend on every occurrence.
+
+    >>> remove_duplicate_search_path_flags(
+    ...     ['-I/a', '-O2', '-I/b', '-I/a', '-O2',
+    ...      '-Wl,-rpath,/c', '-L/d', '-Wl,-rpath,/c', '-L/d'])
+    ['-I/a', '-O2', '-I/b', '-O2', '-Wl,-rpath,/c', '-L/d']
+    >>> remove_duplicate_search_path_flags(['-I', '/a', '-I', '/a'])
+    ['-I', '/a', '-I', '/a']
+    """
+    seen_search_path_flags = set()
+    result = []
+    for flag in flags:
+        if len(flag) > 2 and flag.startswith(SEARCH_PATH_FLAG_PREFIXES):
+            if flag in seen_search_path_flags:
+                continue
+            seen_search_path_flags.add(flag)
+        result.append(flag)
+    return result
 
 
 def get_rpath_flag(path: str) -> str:
@@ -50,15 +115,21 @@ def sanitize_flags_line_for_log(line: str) -> str:
     return line.replace(PLACEHOLDER_RPATH, PLACEHOLDER_RPATH_FOR_LOG)
 
 
-def log_and_set_env_var_to_list(
-        env_var_map: Dict[str, Optional[str]],
-        env_var_name: str,
-        items: List[str]) -> None:
-    value_str = ' '.join(items).strip()
-    if value_str:
-        log('Setting env var %s to %s', env_var_name, value_str)
-        env_var_map[env_var_name] = value_str
-    else:
-        log('Unsetting env var %s', env_var_name)
-        # When used with EnvVarContext, this will cause the environment variable to be unset.
-        env_var_map[env_var_name] = None
+def log_and_get_env_vars_from_lists(
+        items_by_env_var_name: Dict[str, Iterable[str]]) -> Dict[str, Optional[str]]:
+    """
+    Joins each list of items into the value of the corresponding environment variable and logs all
+    the values at once. Empty values are mapped to None, so that EnvVarContext unsets them.
+    """
+    env_vars: Dict[str, Optional[str]] = {}
+    log_lines = []
+    for env_var_name, items in items_by_env_var_name.items():
+        value_str = ' '.join(items).strip()
+        if value_str:
+            log_lines.append('Setting env var %s to %s' % (env_var_name, value_str))
+            env_vars[env_var_name] = value_str
+        else:
+            log_lines.append('Unsetting env var %s' % env_var_name)
+            env_vars[env_var_name] = None
+    log('\n'.join(log_lines))
+    return env_vars
@@ -24,6 +24,8 @@ class BuilderInterface:
     The Builder interface exposed to Dependency instances.
     """
 
+    __slots__ = ()
+
     prefix: str
     compiler_flags: List[str]
     c_flags: List[str]
@@ -55,7 +57,7 @@ class BuilderInterface:
             self,
             dep: 'Dependency',
             extra_args: List[str] = [],
-            use_ninja_if_available: bool = False,
+            use_ninja_if_available: bool = True,
             src_subdir_name: Optional[str] = None,
             extra_build_tool_args: List[str] = [],
             should_install: bool = True,
@@ -79,6 +81,9 @@ class BuilderInterface:
     def add_checked_flag(self, flags: List[str], flag: str) -> None:
         raise NotImplementedError()
 
+    def add_checked_flags(self, flags: List[str], candidate_flags: List[str]) -> None:
+        raise NotImplementedError()
+
     def get_openssl_dir(self) -> str:
         raise NotImplementedError()
 
@@ -12,9 +12,12 @@
 #
 
 import argparse
+import functools
 import sys
 import os
 
+from typing import Callable, Tuple
+
 from sys_detection import is_macos, local_sys_conf
 
 from yugabyte_db_thirdparty.checksums import CHECKSUM_FILE_NAME
@@ -23,7 +26,28 @@ from yugabyte_db_thirdparty.toolchain import TOOLCHAIN_TYPES
 from build_definitions import BUILD_TYPES
 
 
-def parse_cmd_line_args() -> argparse.Namespace:
+# Checks of parsed arguments that do not depend on each other or on the environment, as pairs of a
+# function returning True for invalid arguments and an error message template, formatted with the
+# arguments. Checks that modify the arguments or depend on the OS are in parse_cmd_line_args.
+INVALID_ARG_COMBINATIONS: Tuple[Tuple[Callable[[argparse.Namespace], bool], str], ...] = (
+    (lambda args: bool(args.dependencies and args.skip),
+     "--skip is not compatible with specifying a list of dependencies to build"),
+    (lambda args: bool(args.toolchain and args.devtoolset),
+     "--devtoolset and --toolchain are incompatible"),
+    (lambda args: bool(args.toolchain and args.compiler_prefix),
+     "--compiler-prefix and --toolchain are incompatible"),
+    (lambda args: bool(args.toolchain and args.compiler_suffix),
+     "--compiler-suffix and --toolchain are incompatible"),
+    (lambda args: args.parallel_deps is not None and args.parallel_deps < 1,
+     "--parallel-deps must be a positive number: {parallel_deps}"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def create_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates the command-line argument parser. The parser is created only once per process.
+    """
     parser = argparse.ArgumentParser(prog=sys.argv[0])
     parser.add_argument('--build-type',
                         default=None,
@@ -81,6 +105,12 @@ def parse_cmd_line_args() -> argparse.Namespace:
               'YB_MAKE_PARALLELISM environment variable.',
               type=int)
 
+    parser.add_argument(
+        '--parallel-deps',
+        type=int,
+        help='Build up to this many independent dependencies at the same time. The make '
+             'parallelism is divided between them.')
+
     parser.add_argument(
         '--use-ccache',
         action='store_true',
@@ -136,7 +166,8 @@ def parse_cmd_line_args() -> argparse.Namespace:
     parser.add_argument(
         '--license-report',
         action='store_true',
-        help='Generate a license report.')
+        help='Generate a license report: the list of FOSSA modules for the downloaded archives, '
+             'written to fossa_modules.yml.')
 
     parser.add_argument(
         '--toolchain',
@@ -169,14 +200,19 @@ def parse_cmd_line_args() -> argparse.Namespace:
         nargs=argparse.REMAINDER,
         help='Dependencies to build.')
 
-    args = parser.parse_args()
+    return parser
+
+
+def parse_cmd_line_args() -> argparse.Namespace:
+    args = create_arg_parser().parse_args()
 
     # ---------------------------------------------------------------------------------------------
     # Validating arguments
     # ---------------------------------------------------------------------------------------------
 
-    if args.dependencies and args.skip:
-        raise ValueError("--skip is not compatible with specifying a list of dependencies to build")
+    for is_invalid, error_message_template in INVALID_ARG_COMBINATIONS:
+        if is_invalid(args):
+            raise ValueError(error_message_template.format(**vars(args)))
 
     if is_macos():
         if args.single_compiler_type not in [None, 'clang']:
@@ -209,16 +245,6 @@ def parse_cmd_line_args() -> argparse.Namespace:
                 "--devtoolset is not compatible with compiler type: %s" % args.single_compiler_type)
         args.single_compiler_type = 'gcc'
 
-    if args.toolchain:
-        if args.devtoolset:
-            raise ValueError("--devtoolset and --toolchain are incompatible")
-
-        if args.compiler_prefix:
-            raise ValueError("--compiler-prefix and --toolchain are incompatible")
-
-        if args.compiler_suffix:
-            raise ValueError("--compiler-suffix and --toolchain are incompatible")
-
     if args.multi_build_conf_name_pattern:
         args.multi_build = True
 
@@ -12,7 +12,7 @@
 #
 
 import os
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
 
 from build_definitions import (
     BUILD_TYPE_ASAN,
@@ -50,6 +50,9 @@ class CompilerChoice:
     use_ccache: bool
     cc_identification: Optional[CompilerIdentification]
     cxx_identification: Optional[CompilerIdentification]
+    # Compiler identification results by compiler executable path. Identifying a compiler runs it,
+    # and we switch compilers for every build type.
+    identification_by_compiler_path: Dict[str, CompilerIdentification]
     compiler_version_str: Optional[str]
     expected_major_compiler_version: Optional[int]
 
@@ -75,6 +78,7 @@ class CompilerChoice:
 
         self.cc_identification = None
         self.cxx_identification = None
+        self.identification_by_compiler_path = {}
 
         self.compiler_version_str = None
 
@@ -297,12 +301,19 @@ class CompilerChoice:
                 f"GCC version is too old: {compiler_identification}; "
                 f"required at least {LOWEST_GCC_VERSION_STR}")
 
+    def _identify_compiler(self, compiler_path: str) -> CompilerIdentification:
+        identification = self.identification_by_compiler_path.get(compiler_path)
+        if identification is None:
+            identification = identify_compiler(compiler_path)
+            self.identification_by_compiler_path[compiler_path] = identification
+        return identification
+
     def _identify_compiler_version(self) -> None:
         c_compiler = self.get_c_compiler()
         cxx_compiler = self.get_cxx_compiler()
 
-        self.cc_identification = identify_compiler(c_compiler)
-        self.cxx_identification = identify_compiler(cxx_compiler)
+        self.cc_identification = self._identify_compiler(c_compiler)
+        self.cxx_identification = self._identify_compiler(cxx_compiler)
         if not self.cc_identification.is_compatible_with(self.cxx_identification):
             raise RuntimeError(
                 "C compiler and C++ compiler look incompatible. "
@@ -10,14 +10,16 @@
 # or implied. See the License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import os
+import shutil
 import sys
 import subprocess
 import traceback
 import logging
 
 from yugabyte_db_thirdparty.string_util import shlex_join
-from typing import List, Any, NoReturn, Pattern, Optional
+from typing import Any, Deque, List, NoReturn, Optional, Pattern
 
 
 g_logging_configured = False
@@ -29,6 +31,14 @@ CYAN_COLOR = "\033[0;36m"
 NO_COLOR = "\033[0m"
 SEPARATOR = "-" * 80
 
+# Buffer size for reading the output of commands run by log_output.
+COMMAND_OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Number of last output lines of a failed command to include in the error message. With
+# --parallel-deps, the output of concurrent builds is interleaved in the log, so this makes it easy
+# to see what went wrong.
+NUM_OUTPUT_LINES_IN_ERROR = 50
+
 
 # Based on http://bit.ly/python_terminal_color_detection (code from Django).
 def _terminal_supports_colors() -> bool:
@@ -95,21 +105,35 @@ def log_output(
     try:
         print_line_with_colored_prefix(
             prefix, "Running command: {} (current directory: {})".format(cmd_str, os.getcwd()))
-        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        # CPython starts the process with posix_spawn instead of fork/exec, which is much cheaper
+        # for a parent process with a large memory footprint, only if the executable path has a
+        # directory component and file descriptors do not have to be closed. File descriptors are
+        # not inherited by default anyway (PEP 446).
+        executable = str(args[0])
+        if not os.path.dirname(executable):
+            executable = shutil.which(executable) or executable
+        process = subprocess.Popen(
+            args, executable=executable, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            bufsize=COMMAND_OUTPUT_BUFFER_SIZE, close_fds=False)
         assert process.stdout is not None
+        last_lines: Deque[str] = collections.deque(maxlen=NUM_OUTPUT_LINES_IN_ERROR)
         for line in process.stdout:
             if disallowed_pattern and disallowed_pattern.search(line):
                 raise RuntimeError(
                     "Output line from command [[ {} ]] contains a disallowed pattern: {}".format(
                         cmd_str, disallowed_pattern))
 
-            print_line_with_colored_prefix(prefix, line.decode('utf-8'))
+            decoded_line = line.decode('utf-8')
+            last_lines.append(decoded_line.rstrip())
+            print_line_with_colored_prefix(prefix, decoded_line)
 
         process.stdout.close()
         exit_code = process.wait()
         if exit_code:
             # We do not use fatal() here because that would skip upstream exception handling.
-            raise RuntimeError("Execution failed with code: {}".format(exit_code))
+            raise RuntimeError(
+                "Execution failed with code: {}. Command: {}. Last {} lines of output:\n{}".format(
+                    exit_code, cmd_str, len(last_lines), "\n".join(last_lines)))
     except OSError as err:
         log("Error when trying to execute command: " + str(args))
         log("PATH is: %s", os.getenv("PATH"))
@@ -29,6 +29,10 @@ class Dependency:
     copy_sources: bool
     license: Optional[str]
 
+    # Names of the dependencies that have to be built before this one. None means this dependency
+    # has to wait for all dependencies listed before it. Only used with --parallel-deps.
+    depends_on: Optional[List[str]]
+
     def __init__(
             self,
             name: str,
@@ -55,6 +59,7 @@ class Dependency:
         self.post_patch = []
         self.copy_sources = False
         self.license = license
+        self.depends_on = None
 
         if build_group not in VALID_BUILD_GROUPS:
             raise ValueError("Invalid build group: %s, should be one of: %s" % (
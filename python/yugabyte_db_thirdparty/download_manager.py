@@ -20,7 +20,7 @@ import time
 from typing import Optional, List, Dict, cast
 from urllib.parse import urlparse
 
-from yugabyte_db_thirdparty.archive_handling import ARCHIVE_TYPES
+from yugabyte_db_thirdparty.archive_handling import ARCHIVE_TYPES, get_extract_cmd
 from yugabyte_db_thirdparty.archive_handling import split_archive_file_name
 from yugabyte_db_thirdparty.checksums import (
     get_checksum_file_path, CHECKSUM_SUFFIX)
@@ -113,7 +113,7 @@ class DownloadManager:
 
         try:
             with PushDir(tmp_out_dir):
-                cmd = ARCHIVE_TYPES[archive_extension].format(archive_file_name)
+                cmd = get_extract_cmd(archive_file_name, archive_extension)
                 log("Extracting %s in temporary directory %s", cmd, tmp_out_dir)
                 subprocess.check_call(cmd, shell=True)
                 extracted_subdirs = [
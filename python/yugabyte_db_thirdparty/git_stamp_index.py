@@ -0,0 +1,145 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Git information about the files that dependency build stamps are computed from, collected with a
+fixed number of git invocations for all dependencies at once.
+"""
+
+import hashlib
+import subprocess
+
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from yugabyte_db_thirdparty.util import PushDir
+
+GIT_COMMIT_LINE_PREFIX = b'commit '
+GIT_DIFF_HEADER_PREFIX = b'diff --git '
+
+# Extra arguments to "git diff" that build stamps include the diff hashes for.
+GIT_DIFF_EXTRA_ARGS_FOR_STAMP: List[List[str]] = [[], ['--cached']]
+
+
+def hash_git_diff_by_file(git_diff_lines: Iterable[bytes]) -> List[Tuple[str, bytes]]:
+    """
+    Computes the SHA256 digest of the part of "git diff" output for every file, keeping the order in
+    which git printed the files. Only the digests are kept, not the diff itself.
+
+    >>> hash_git_diff_by_file([])
+    []
+    >>> digests = hash_git_diff_by_file([b'diff --git a/x b/x\\n', b'-1\\n', b'+2\\n',
+    ...                                  b'diff --git a/y/z b/y/z\\n', b'+3\\n'])
+    >>> [path for path, _ in digests]
+    ['x', 'y/z']
+    >>> digests[1][1] == hashlib.sha256(b'diff --git a/y/z b/y/z\\n+3\\n').digest()
+    True
+    """
+    digests: List[Tuple[str, bytes]] = []
+    current_path: Optional[str] = None
+    current_hash = hashlib.sha256()
+    for line in git_diff_lines:
+        if line.startswith(GIT_DIFF_HEADER_PREFIX):
+            if current_path is not None:
+                digests.append((current_path, current_hash.digest()))
+            current_path = line.rstrip(b'\n').rpartition(b' b/')[2].decode('utf-8')
+            current_hash = hashlib.sha256()
+        current_hash.update(line)
+    if current_path is not None:
+        digests.append((current_path, current_hash.digest()))
+    return digests
+
+
+class GitStampIndex:
+    """
+    Runs one "git log" and one "git diff" per set of extra diff arguments over all the given files,
+    relative to the repository root, and answers questions about any subset of the files from their
+    results.
+    """
+
+    paths: Set[str]
+
+    # For every path, the position in "git log" output and the SHA1 of the latest commit that
+    # touched it.
+    last_commit_by_path: Dict[str, Tuple[int, str]]
+
+    # SHA256 digests of the per-file parts of "git diff" output, keyed by the space-separated extra
+    # diff arguments.
+    diff_digests_by_extra_args: Dict[str, List[Tuple[str, bytes]]]
+
+    def __init__(self, repo_dir: str, paths: List[str]) -> None:
+        self.paths = set(paths)
+        self.last_commit_by_path = {}
+        self.diff_digests_by_extra_args = {}
+        with PushDir(repo_dir):
+            self._find_last_commits()
+            for extra_args in GIT_DIFF_EXTRA_ARGS_FOR_STAMP:
+                self.diff_digests_by_extra_args[' '.join(extra_args)] = self._get_diff_digests(
+                    extra_args)
+
+    def _get_diff_digests(self, extra_args: List[str]) -> List[Tuple[str, bytes]]:
+        # Hash the output while reading it, so that the diff is never held in memory.
+        args = ['git', 'diff'] + extra_args + ['--'] + sorted(self.paths)
+        with subprocess.Popen(args, stdout=subprocess.PIPE) as process:
+            assert process.stdout is not None
+            digests = hash_git_diff_by_file(process.stdout)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, args)
+        return digests
+
+    def _find_last_commits(self) -> None:
+        process = subprocess.Popen(
+            ['git', 'log', '--pretty=format:commit %H', '--name-only', '--'] + sorted(self.paths),
+            stdout=subprocess.PIPE)
+        assert process.stdout is not None
+        commit_index = -1
+        commit_sha1 = ''
+        found_all_paths = False
+        try:
+            for line in process.stdout:
+                line = line.rstrip(b'\n')
+                if line.startswith(GIT_COMMIT_LINE_PREFIX):
+                    commit_index += 1
+                    commit_sha1 = line[len(GIT_COMMIT_LINE_PREFIX):].decode('utf-8')
+                    continue
+                path = line.decode('utf-8')
+                if path in self.paths and path not in self.last_commit_by_path:
+                    self.last_commit_by_path[path] = (commit_index, commit_sha1)
+                    if len(self.last_commit_by_path) == len(self.paths):
+                        # The rest of the history cannot change the result.
+                        found_all_paths = True
+                        break
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            return_code = process.wait()
+        if not found_all_paths and return_code != 0:
+            raise subprocess.CalledProcessError(return_code, process.args)
+
+    def get_last_commit(self, paths: List[str]) -> str:
+        """
+        Returns what "git log --pretty=%H -n 1 <paths>" would return: the latest commit that touched
+        any of the given files, or an empty string if there is no such commit.
+        """
+        commits = [self.last_commit_by_path[path] for path in paths
+                   if path in self.last_commit_by_path]
+        return min(commits)[1] if commits else ''
+
+    def iter_diff_digests(self, extra_args: List[str], paths: List[str]) -> Iterator[bytes]:
+        """
+        Yields the SHA256 digests of the per-file parts of what "git diff <extra_args> <paths>"
+        would return, in order.
+        """
+        path_set = set(paths)
+        for path, digest in self.diff_digests_by_extra_args[' '.join(extra_args)]:
+            if path in path_set:
+                yield digest
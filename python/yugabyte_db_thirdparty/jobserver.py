@@ -0,0 +1,130 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+A GNU make jobserver that lets make and Ninja processes of dependencies built at the same time
+share one pool of job slots, instead of each of them running its own number of jobs.
+"""
+
+import functools
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from typing import Any, List, Optional, Tuple
+
+from yugabyte_db_thirdparty.builder_helpers import get_make_parallelism
+from yugabyte_db_thirdparty.custom_logging import log
+from yugabyte_db_thirdparty.util import EnvVarContext, which_executable
+
+JOBSERVER_AUTH_PREFIX = '--jobserver-auth=fifo:'
+
+# GNU make supports named pipe jobservers starting with this version.
+MIN_MAKE_VERSION_FOR_FIFO_JOBSERVER = (4, 4)
+
+# Ninja acts as a jobserver client starting with this version.
+MIN_NINJA_VERSION_FOR_JOBSERVER = (1, 13)
+
+
+@functools.lru_cache(maxsize=None)
+def get_tool_version(tool_name: str) -> Optional[Tuple[int, ...]]:
+    """
+    Returns the version reported by "<tool> --version" as a tuple of integers, or None if the tool
+    is not available or the version could not be parsed.
+    """
+    if not which_executable(tool_name):
+        return None
+    try:
+        version_output = subprocess.check_output([tool_name, '--version']).decode('utf-8')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    match = re.search(r'(\d+)\.(\d+)', version_output)
+    if not match:
+        return None
+    return tuple(int(component) for component in match.groups())
+
+
+def is_jobserver_supported() -> bool:
+    make_version = get_tool_version('make')
+    return make_version is not None and make_version >= MIN_MAKE_VERSION_FOR_FIFO_JOBSERVER
+
+
+def is_jobserver_active() -> bool:
+    return JOBSERVER_AUTH_PREFIX in os.environ.get('MAKEFLAGS', '')
+
+
+def get_build_tool_parallelism_args(build_tool: str) -> List[str]:
+    """
+    Returns the -j argument to pass to make or Ninja. When a jobserver is active and the build tool
+    can use it, the build tool gets its job slots from the jobserver and we do not specify -j.
+    """
+    if is_jobserver_active():
+        if build_tool == 'make':
+            return []
+        ninja_version = get_tool_version('ninja')
+        if (build_tool == 'ninja' and ninja_version is not None and
+                ninja_version >= MIN_NINJA_VERSION_FOR_JOBSERVER):
+            return []
+    return ['-j{}'.format(get_make_parallelism())]
+
+
+class JobServer:
+    """
+    Creates a named pipe with the given number of job slots and exports it through MAKEFLAGS to all
+    processes started within the context. Each make or Ninja process has one implicit job slot, so
+    the pipe only holds the slots beyond one per concurrently running build.
+    """
+
+    num_slots: int
+    num_builds: int
+    tmp_dir: Optional[str]
+    fd: Optional[int]
+    env_var_context: Optional[EnvVarContext]
+
+    def __init__(self, num_slots: int, num_builds: int) -> None:
+        self.num_slots = num_slots
+        self.num_builds = num_builds
+        self.tmp_dir = None
+        self.fd = None
+        self.env_var_context = None
+
+    def __enter__(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp(prefix='yb_thirdparty_jobserver_')
+        fifo_path = os.path.join(self.tmp_dir, 'fifo')
+        os.mkfifo(fifo_path)
+        # Keep the pipe open for both reading and writing for as long as the builds run, so that
+        # it never appears closed to the build tools.
+        self.fd = os.open(fifo_path, os.O_RDWR)
+        num_tokens = max(0, self.num_slots - self.num_builds)
+        os.write(self.fd, b'+' * num_tokens)
+
+        makeflags = ' '.join(filter(None, [
+            os.environ.get('MAKEFLAGS', ''),
+            '-j{}'.format(self.num_slots),
+            JOBSERVER_AUTH_PREFIX + fifo_path
+        ]))
+        log("Started a jobserver with %d slots at %s", self.num_slots, fifo_path)
+        self.env_var_context = EnvVarContext(MAKEFLAGS=makeflags)
+        self.env_var_context.__enter__()
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if self.env_var_context is not None:
+            self.env_var_context.__exit__(exc_type, exc_val, exc_tb)
+            self.env_var_context = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if self.tmp_dir is not None:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
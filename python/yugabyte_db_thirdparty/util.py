@@ -11,12 +11,15 @@
 # under the License.
 #
 
+import functools
 import os
 import sys
 import hashlib
 import shutil
 import shlex
+import stat
 import subprocess
+import tempfile
 import time
 import datetime
 import random
@@ -209,6 +212,117 @@ def write_file(file_path: str, data: str) -> None:
         output_file.write(data)
 
 
+@functools.lru_cache(maxsize=1)
+def get_umask() -> int:
+    """
+    Returns the file mode creation mask of this process. The only way to read it is to set it, so
+    we do that once and restore it immediately.
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_file_atomically(file_path: str, data: str) -> None:
+    """
+    Writes the given data to a temporary file in the same directory and renames it to the target
+    path, so that the target file is never left partially written.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_path)),
+        prefix='.%s.' % os.path.basename(file_path),
+        suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as output_file:
+            output_file.write(data)
+        # mkstemp creates the file readable and writable only by the owner. Use the permissions a
+        # regular file created with open() would have.
+        os.chmod(tmp_path, 0o666 & ~get_umask())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def find_files_with_name(
+        root_dir: str,
+        file_name: str,
+        max_depth: int,
+        timeout_sec: float,
+        skip_dir_names: Set[str] = set()) -> List[str]:
+    """
+    Returns the paths of files with the given name in root_dir and its subdirectories, looking at
+    most max_depth levels deep and skipping directories with the given names. Stops looking after
+    timeout_sec seconds and returns the files found so far, so this is safe to use on large trees.
+    """
+    deadline = time.monotonic() + timeout_sec
+    root_depth = root_dir.rstrip(os.sep).count(os.sep)
+    found_paths = []
+    for dir_path, dir_names, file_names in os.walk(root_dir):
+        if time.monotonic() > deadline:
+            log("Stopped looking for %s in %s after %.1f seconds", file_name, root_dir, timeout_sec)
+            break
+        if file_name in file_names:
+            found_paths.append(os.path.join(dir_path, file_name))
+        if dir_path.count(os.sep) - root_depth >= max_depth:
+            dir_names[:] = []
+        else:
+            dir_names[:] = [name for name in dir_names if name not in skip_dir_names]
+    return found_paths
+
+
+def copy_dir_contents(src_dir: str, dst_dir: str) -> None:
+    """
+    Copies the contents of src_dir into dst_dir the way "rsync -a src_dir/ dst_dir" does. Symlinks
+    are copied as symlinks, and permissions and modification times are preserved. Files already in
+    dst_dir with the same size and modification time as in src_dir are left alone, and files that
+    only exist in dst_dir are kept. Special files such as named pipes are skipped.
+    """
+    copied_dirs = []
+    for dir_path, dir_names, file_names in os.walk(src_dir):
+        dst_dir_path = os.path.normpath(os.path.join(dst_dir, os.path.relpath(dir_path, src_dir)))
+        os.makedirs(dst_dir_path, exist_ok=True)
+        copied_dirs.append((dir_path, dst_dir_path))
+
+        # os.walk lists symlinks to directories in dir_names without following them.
+        link_names = [name for name in dir_names if os.path.islink(os.path.join(dir_path, name))]
+        for name in link_names + file_names:
+            src_path = os.path.join(dir_path, name)
+            dst_path = os.path.join(dst_dir_path, name)
+            src_stat = os.lstat(src_path)
+            try:
+                dst_stat: Optional[os.stat_result] = os.lstat(dst_path)
+            except FileNotFoundError:
+                dst_stat = None
+
+            if stat.S_ISLNK(src_stat.st_mode):
+                link_target = os.readlink(src_path)
+                if (dst_stat is not None and stat.S_ISLNK(dst_stat.st_mode) and
+                        os.readlink(dst_path) == link_target):
+                    continue
+            elif stat.S_ISREG(src_stat.st_mode):
+                if (dst_stat is not None and stat.S_ISREG(dst_stat.st_mode) and
+                        dst_stat.st_size == src_stat.st_size and
+                        int(dst_stat.st_mtime) == int(src_stat.st_mtime)):
+                    continue
+            else:
+                continue
+
+            if dst_stat is not None:
+                # Replace rather than overwrite, in case the existing file is read-only.
+                remove_path(dst_path)
+            if stat.S_ISLNK(src_stat.st_mode):
+                os.symlink(link_target, dst_path)
+            else:
+                shutil.copy2(src_path, dst_path)
+
+    # Adding entries to a directory changes its modification time, so we copy directory metadata
+    # after all the contents are in place, starting from the deepest directories.
+    for src_dir_path, dst_dir_path in reversed(copied_dirs):
+        shutil.copystat(src_dir_path, dst_dir_path)
+
+
 def add_path_entry(new_path_entry: str) -> None:
     """
     Adds a new PATH entry in front of the PATH environment variable, if it is not already present.